@@ -1,8 +1,8 @@
-"""
-Main application package for SDN DHR Defense System
-"""
-
-from . import api
-from . import core
-
+"""
+Main application package for SDN DHR Defense System
+"""
+
+from . import api
+from . import core
+
 __all__ = ['api', 'core'] 
\ No newline at end of file
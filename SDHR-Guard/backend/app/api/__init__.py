@@ -1,19 +1,43 @@
-from fastapi import APIRouter
-from .controllers import router as controllers_router
-from .monitor import router as monitor_router
-
-router = APIRouter()
-
-# 注册控制器路由
-router.include_router(
-    controllers_router, 
-    prefix="/controllers", 
-    tags=["controllers"]
-)
-
-# 注册监控路由
-router.include_router(
-    monitor_router,
-    prefix="/monitor",
-    tags=["monitor"]
-) 
\ No newline at end of file
+from fastapi import APIRouter
+from .controllers import router as controllers_router
+from .monitor import router as monitor_router
+from .topology import router as topology_router
+from .dashboard import router as dashboard_router
+from .traces import router as traces_router
+
+router = APIRouter()
+
+# 注册控制器路由
+router.include_router(
+    controllers_router, 
+    prefix="/controllers", 
+    tags=["controllers"]
+)
+
+# 注册监控路由
+router.include_router(
+    monitor_router,
+    prefix="/monitor",
+    tags=["monitor"]
+)
+
+# 注册拓扑路由
+router.include_router(
+    topology_router,
+    prefix="/topology",
+    tags=["topology"]
+)
+
+# 注册仪表盘路由
+router.include_router(
+    dashboard_router,
+    prefix="/dashboard",
+    tags=["dashboard"]
+)
+
+# 注册追踪路由
+router.include_router(
+    traces_router,
+    prefix="/traces",
+    tags=["traces"]
+)
\ No newline at end of file
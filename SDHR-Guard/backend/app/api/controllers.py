@@ -1,48 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from app.core.controller import ControllerManager
-import logging
-
-logger = logging.getLogger(__name__)
-router = APIRouter()
-controller_manager = ControllerManager()
-
-@router.get("/")
-async def get_controllers():
-    """获取所有控制器状态"""
-    return controller_manager.get_all_status()
-
-@router.post("/{controller_id}/start")
-async def start_controller(controller_id: str):
-    """启动指定控制器"""
-    try:
-        result = await controller_manager.start_controller(controller_id)
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"启动控制器失败: {str(e)}")
-        raise HTTPException(status_code=500, detail="启动控制器失败")
-
-@router.post("/{controller_id}/stop")
-async def stop_controller(controller_id: str):
-    """停止指定控制器"""
-    try:
-        result = await controller_manager.stop_controller(controller_id)
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"停止控制器失败: {str(e)}")
-        raise HTTPException(status_code=500, detail="停止控制器失败")
-
-@router.get("/{controller_id}/health")
-async def check_controller_health(controller_id: str):
-    """获取指定控制器的健康状态"""
-    try:
-        result = await controller_manager.health_check(controller_id)
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"健康检查失败: {str(e)}")
+from fastapi import APIRouter, HTTPException
+from app.core.controller import ControllerManager
+from config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+if settings.RUN_MODE == 'worker':
+    from app.core.remote import RemoteControllerManager
+    controller_manager = RemoteControllerManager()
+else:
+    controller_manager = ControllerManager()
+
+@router.get("/")
+async def get_controllers():
+    """获取所有控制器状态"""
+    return controller_manager.get_all_status()
+
+@router.post("/switchover")
+async def switchover(from_id: str, to_id: str):
+    """将主控制器从 from_id 切换到 to_id"""
+    try:
+        return await controller_manager.switchover(from_id, to_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"切换控制器失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="切换控制器失败")
+
+@router.post("/{controller_id}/start")
+async def start_controller(controller_id: str):
+    """启动指定控制器"""
+    try:
+        result = await controller_manager.start_controller(controller_id)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"启动控制器失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="启动控制器失败")
+
+@router.post("/{controller_id}/stop")
+async def stop_controller(controller_id: str):
+    """停止指定控制器"""
+    try:
+        result = await controller_manager.stop_controller(controller_id)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"停止控制器失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="停止控制器失败")
+
+@router.get("/{controller_id}/health")
+async def check_controller_health(controller_id: str):
+    """获取指定控制器的健康状态"""
+    try:
+        result = await controller_manager.health_check(controller_id)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"健康检查失败: {str(e)}")
         raise HTTPException(status_code=500, detail="健康检查失败")
\ No newline at end of file
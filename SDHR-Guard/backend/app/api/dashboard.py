@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request, Response
+from app.core.dashboard import DashboardSummary
+from config.settings import settings
+
+router = APIRouter()
+if settings.RUN_MODE == 'worker':
+    from app.core.remote import RemoteDashboardSummary
+    dashboard_summary = RemoteDashboardSummary()
+else:
+    dashboard_summary = DashboardSummary()
+
+@router.get("")
+async def get_dashboard(request: Request):
+    """获取仪表盘摘要（预先编码，直接返回）"""
+    etag = dashboard_summary.etag
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=dashboard_summary.encoded,
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
@@ -1,19 +1,56 @@
-from fastapi import APIRouter, HTTPException
-from app.core.monitor import FlowMonitor
-
-router = APIRouter()
-flow_monitor = FlowMonitor()
-
-@router.get("/stats/{switch_id}")
-async def get_flow_stats(switch_id: str):
-    """获取指定交换机的流量统计"""
-    try:
-        stats = await flow_monitor.collect_stats(switch_id)
-        return stats
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/stats/history")
-async def get_flow_history():
-    """获取流量历史数据"""
-    return flow_monitor.get_flow_history() 
\ No newline at end of file
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.core.monitor import FlowMonitor
+from app.core.collector import CollectionScheduler
+from config.settings import settings
+
+router = APIRouter()
+if settings.RUN_MODE == 'worker':
+    from app.core.remote import RemoteFlowMonitor
+    from app.core.remote import RemoteCollectionScheduler
+    flow_monitor = RemoteFlowMonitor()
+    collection_scheduler = RemoteCollectionScheduler()
+else:
+    flow_monitor = FlowMonitor()
+    collection_scheduler = CollectionScheduler()
+
+@router.get("/flow/history")
+@router.get("/stats/history")
+async def get_flow_history(
+    start: Optional[float] = Query(None, alias="from", description="起始时间(epoch秒)，默认为结束时间前1小时"),
+    end: Optional[float] = Query(None, alias="to", description="结束时间(epoch秒)，默认为当前时间"),
+    max_points: int = Query(100, ge=4, le=5000, description="最多返回的点数"),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$", description="降采样方法"),
+    switch_id: Optional[str] = Query(None, description="交换机，不指定则返回全网汇总")
+):
+    """获取流量历史数据（按时间范围截取并降采样）"""
+    try:
+        return flow_monitor.get_flow_history(start, end, max_points, method, switch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/flows/top")
+async def get_top_flows(
+    k: int = Query(10, ge=1, le=1000, description="返回的流表项数量"),
+    by: str = Query("bytes", pattern="^(bytes|packets|rate|growth)$", description="排序字段"),
+    switch_id: Optional[str] = Query(None, description="交换机，不指定则查询全网")
+):
+    """获取 top-k 流表项"""
+    try:
+        return flow_monitor.get_top_flows(k, by, switch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/collector")
+async def get_collector_status():
+    """获取自适应采集调度状态（各交换机采集间隔和全局预算）"""
+    return collection_scheduler.get_status()
+
+@router.get("/stats/{switch_id}")
+async def get_flow_stats(switch_id: str):
+    """获取指定交换机的流量统计"""
+    try:
+        stats = await flow_monitor.collect_stats(switch_id)
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,25 +1,55 @@
-from fastapi import APIRouter, HTTPException
-from app.core.topology import TopologyManager
-import logging
-
-logger = logging.getLogger(__name__)
-router = APIRouter()
-topology_manager = TopologyManager()
-
-@router.get("/")
-async def get_topology():
-    """获取当前网络拓扑"""
-    try:
-        return topology_manager.get_current_topology()
-    except Exception as e:
-        logger.error(f"获取拓扑失败: {str(e)}")
-        raise HTTPException(status_code=500, detail="获取拓扑失败")
-
-@router.get("/stats")
-async def get_topology_stats():
-    """获取拓扑统计信息"""
-    try:
-        return topology_manager.get_statistics()
-    except Exception as e:
-        logger.error(f"获取统计信息失败: {str(e)}")
+from fastapi import APIRouter, HTTPException, Query
+from app.core.topology import TopologyManager
+from config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+if settings.RUN_MODE == 'worker':
+    from app.core.remote import RemoteTopologyManager
+    topology_manager = RemoteTopologyManager()
+else:
+    topology_manager = TopologyManager()
+
+@router.get("")
+async def get_topology():
+    """获取当前网络拓扑"""
+    try:
+        return topology_manager.get_current_topology()
+    except Exception as e:
+        logger.error(f"获取拓扑失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="获取拓扑失败")
+
+@router.get("/changes")
+async def get_topology_changes(since: int = Query(0, ge=0, description="客户端已有的拓扑版本")):
+    """获取某版本之后的拓扑增量"""
+    try:
+        return topology_manager.get_changes(since)
+    except Exception as e:
+        logger.error(f"获取拓扑增量失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="获取拓扑增量失败")
+
+@router.get("/paths")
+async def get_paths(
+    src: str = Query(..., description="源节点"),
+    dst: str = Query(..., description="目的节点"),
+    mode: str = Query("shortest", description="shortest / k_shortest / disjoint"),
+    k: int = Query(1, ge=1, le=16, description="路径条数")
+):
+    """查询两节点间的路径"""
+    try:
+        return await topology_manager.find_paths(src, dst, mode, k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"路径查询失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="路径查询失败")
+
+@router.get("/stats")
+async def get_topology_stats():
+    """获取拓扑统计信息"""
+    try:
+        return topology_manager.get_statistics()
+    except Exception as e:
+        logger.error(f"获取统计信息失败: {str(e)}")
         raise HTTPException(status_code=500, detail="获取统计信息失败") 
\ No newline at end of file
@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.core.tracing import tracer as local_tracer
+from config.settings import settings
+
+router = APIRouter()
+if settings.RUN_MODE == 'worker':
+    from app.core.remote import RemoteTracer
+    tracer = RemoteTracer()
+else:
+    tracer = local_tracer
+
+@router.get("")
+async def get_traces(
+    format: str = Query("json", pattern="^(json|chrome)$", description="导出格式"),
+    limit: Optional[int] = Query(None, ge=1, description="最多返回的span数")
+):
+    """导出控制器启动/停止/切换的分阶段追踪数据"""
+    if format == "chrome":
+        return tracer.export_chrome(limit)
+    return tracer.export_json(limit)
+
+@router.get("/summary")
+async def get_trace_summary():
+    """获取各阶段延迟分位数(ms)"""
+    return tracer.summary()
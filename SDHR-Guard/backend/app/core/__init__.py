@@ -1,9 +1,10 @@
-"""
-Core module for SDN DHR Defense System
-包含核心功能实现，如控制器管理和拓扑管理
-"""
-
-from .controller import ControllerManager
-from .topology import TopologyManager
-
-__all__ = ['ControllerManager', 'TopologyManager'] 
\ No newline at end of file
+"""
+Core module for SDN DHR Defense System
+包含核心功能实现，如控制器管理和拓扑管理
+"""
+
+from .controller import ControllerManager
+from .topology import TopologyManager
+from .dashboard import DashboardSummary
+
+__all__ = ['ControllerManager', 'TopologyManager', 'DashboardSummary'] 
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""自适应流量采集调度
+
+每台交换机有自己的采集间隔，按到期时间放在最小堆中依次采集：
+    速率相对 EWMA 均值的 z 分数超过 anomaly_z   -> 直接降到 min_interval
+    速率变异系数超过 variance_cv               -> 间隔减半
+    速率低于 idle_rate                         -> 间隔翻倍，直到 max_interval
+    其余情况                                   -> 逐步回到 metrics_interval
+全局用两个令牌桶限流：dpctl 调用数（每次采集 2 次）不超过 dpctl_budget 次/秒，
+采集耗时（dpctl 在事件循环线程中同步执行）占比不超过 cpu_ceiling。
+已到期的采集按 到期时间 + INTERVAL_WEIGHT × 采集间隔 排队：预算不足时间隔短
+（速率异常或波动大）的交换机优先；空闲交换机的排序键固定，逾期约
+INTERVAL_WEIGHT 个自身间隔后排到前面，不会饿死。
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from config.dhr_config import DHR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 每次 collect_stats 调用 dump-ports 和 dump-flows
+DPCTL_CALLS_PER_COLLECT = 2
+# 就绪队列中采集间隔相对到期时间的权重
+INTERVAL_WEIGHT = 10
+
+class TokenBucket:
+    """令牌桶，允许余额为负（先用后扣）"""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def wait_time(self, amount: float) -> float:
+        """距离余额足够 amount 还需等待的秒数"""
+        self._refill()
+        return max(amount - self.tokens, 0) / self.rate
+
+class CollectionScheduler:
+    """按交换机自适应调整采集间隔的调度器"""
+    def __init__(self, config: Optional[dict] = None):
+        config = config or DHR_CONFIG['monitoring']['collection']
+        self.base_interval = DHR_CONFIG['monitoring']['metrics_interval']
+        self.min_interval = config['min_interval']
+        self.max_interval = config['max_interval']
+        self.alpha = config['ewma_alpha']
+        self.anomaly_z = config['anomaly_z']
+        self.variance_cv = config['variance_cv']
+        self.idle_rate = config['idle_rate']
+        self.calls = TokenBucket(config['dpctl_budget'], config['dpctl_budget'])
+        self.cpu = TokenBucket(config['cpu_ceiling'], config['cpu_ceiling'])
+
+        self.flow_monitor = None
+        self.topology_manager = None
+        self.switches: Dict[str, dict] = {}
+        self._heap = []    # (到期时间, 序号, 交换机)，尚未到期
+        self._ready = []   # (优先级, 序号, 交换机, 到期时间)，已到期等待预算
+        self._seq = itertools.count()
+        self._topology_version = None
+        self._busy = 0.0
+        self._started: Optional[float] = None
+        self._collections = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def attach(self, flow_monitor, topology_manager):
+        """订阅采集结果；手动触发的采集同样计入 dpctl 预算和速率模型"""
+        self.flow_monitor = flow_monitor
+        self.topology_manager = topology_manager
+        flow_monitor.add_listener(self.on_event)
+
+    def on_event(self, event: dict):
+        if event.get('type') != 'flow':
+            return
+        self.calls.consume(DPCTL_CALLS_PER_COLLECT)
+        self._collections += 1
+        state = self.switches.get(event['switch_id'])
+        if state is not None:
+            self._observe(state, event['timestamp'], event['bytes'])
+
+    def _observe(self, state: dict, timestamp: float, total_bytes: int):
+        """更新速率的 EWMA 均值/方差，并据此调整采集间隔"""
+        last = state['last']
+        state['last'] = (timestamp, total_bytes)
+        if last is None or timestamp <= last[0]:
+            return
+        # 计数器回绕或交换机重启时差值为负，按 0 处理
+        rate = max(total_bytes - last[1], 0) / (timestamp - last[0])
+        state['rate'] = rate
+        if state['samples'] == 0:
+            state['mean'] = rate
+        std = math.sqrt(state['var'])
+        diff = rate - state['mean']
+        state['z'] = abs(diff) / std if std > 0 else 0.0
+        increment = self.alpha * diff
+        state['mean'] += increment
+        state['var'] = (1 - self.alpha) * (state['var'] + diff * increment)
+        state['samples'] += 1
+
+        cv = math.sqrt(state['var']) / state['mean'] if state['mean'] > 0 else 0.0
+        interval = state['interval']
+        # 样本太少时方差不可靠，不做异常判断
+        if state['samples'] > 3 and state['z'] >= self.anomaly_z:
+            interval = self.min_interval
+        elif rate < self.idle_rate and state['mean'] < self.idle_rate:
+            interval *= 2
+        elif cv > self.variance_cv:
+            interval /= 2
+        elif interval < self.base_interval:
+            interval = min(interval * 1.25, self.base_interval)
+        else:
+            interval = max(interval / 1.25, self.base_interval)
+        state['interval'] = min(max(interval, self.min_interval), self.max_interval)
+
+    def _schedule(self, switch_id: str, due: float):
+        state = self.switches[switch_id]
+        state['due'] = due
+        heapq.heappush(self._heap, (due, next(self._seq), switch_id))
+
+    def _sync_switches(self):
+        """拓扑版本变化时同步交换机集合"""
+        graph = self.topology_manager.graph
+        if graph.version == self._topology_version:
+            return
+        self._topology_version = graph.version
+        current = {name for name, node in graph.nodes.items() if node['type'] == 'switch'}
+        for switch_id in list(self.switches):
+            if switch_id not in current:
+                # 堆中残留的条目在弹出时丢弃
+                del self.switches[switch_id]
+                self.flow_monitor.forget_switch(switch_id)
+        now = time.monotonic()
+        for switch_id in current - self.switches.keys():
+            self.switches[switch_id] = {
+                'interval': self.base_interval, 'due': now, 'last': None,
+                'rate': 0.0, 'mean': 0.0, 'var': 0.0, 'z': 0.0, 'samples': 0, 'errors': 0
+            }
+            self._schedule(switch_id, now)
+
+    def _is_current(self, switch_id: str, due: float) -> bool:
+        """条目是否仍有效（交换机未移除且未被重新调度）"""
+        state = self.switches.get(switch_id)
+        return state is not None and state['due'] == due
+
+    def _promote(self, now: float):
+        """把已到期的条目移入就绪队列"""
+        while self._heap and self._heap[0][0] <= now:
+            due, seq, switch_id = heapq.heappop(self._heap)
+            if self._is_current(switch_id, due):
+                priority = due + INTERVAL_WEIGHT * self.switches[switch_id]['interval']
+                heapq.heappush(self._ready, (priority, seq, switch_id, due))
+
+    async def _run(self):
+        self._started = time.monotonic()
+        while True:
+            self._sync_switches()
+            self._promote(time.monotonic())
+            while self._ready and not self._is_current(self._ready[0][2], self._ready[0][3]):
+                heapq.heappop(self._ready)
+            if not self._ready:
+                wait = self._heap[0][0] - time.monotonic() if self._heap else self.min_interval
+                # 分段等待，以便及时发现拓扑变化
+                await asyncio.sleep(min(max(wait, 0), self.min_interval))
+                continue
+
+            wait = max(self.calls.wait_time(DPCTL_CALLS_PER_COLLECT), self.cpu.wait_time(0))
+            if wait > 0:
+                await asyncio.sleep(min(wait, self.min_interval))
+                continue
+
+            switch_id = heapq.heappop(self._ready)[2]
+            state = self.switches[switch_id]
+            begin = time.monotonic()
+            try:
+                await self.flow_monitor.collect_stats(switch_id)
+                state['errors'] = 0
+            except Exception:
+                # collect_stats 已记录日志；连续失败时逐步退避
+                state['errors'] += 1
+                state['interval'] = min(state['interval'] * 2, self.max_interval)
+            elapsed = time.monotonic() - begin
+            self._busy += elapsed
+            self.cpu.consume(elapsed)
+            if switch_id in self.switches:
+                self._schedule(switch_id, time.monotonic() + state['interval'])
+
+    def get_status(self):
+        """获取调度状态"""
+        uptime = time.monotonic() - self._started if self._started else 0
+        demand = sum(DPCTL_CALLS_PER_COLLECT / state['interval'] for state in self.switches.values())
+        return {
+            'dpctl_budget': self.calls.rate,
+            'dpctl_demand': round(demand, 3),
+            'dpctl_rate': round(self._collections * DPCTL_CALLS_PER_COLLECT / uptime, 3) if uptime else 0.0,
+            'cpu_ceiling': self.cpu.rate,
+            'cpu_usage': round(self._busy / uptime, 4) if uptime else 0.0,
+            'switches': {
+                switch_id: {
+                    'interval': round(state['interval'], 3),
+                    'rate': round(state['rate'], 3),
+                    'mean': round(state['mean'], 3),
+                    'z': round(state['z'], 3),
+                    'errors': state['errors']
+                }
+                for switch_id, state in sorted(self.switches.items())
+            }
+        }
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,171 +1,343 @@
-import asyncio
-import logging
-import os
-from typing import Dict
-from config.settings import settings
-
-logger = logging.getLogger(__name__)
-
-class ControllerManager:
-    def __init__(self):
-        self.controllers: Dict[str, dict] = {
-            'ryu': {
-                'status': 'uninit',  # 初始状态为 uninit
-                'health': 'uninit',  # 健康状态为 uninit
-                'path': settings.CONTROLLERS['ryu']['path'],
-                'port': settings.CONTROLLERS['ryu']['port'],
-                'app': settings.CONTROLLERS['ryu']['app'],
-                'process': None
-            },
-            'pox': {
-                'status': 'uninit',
-                'health': 'uninit',
-                'path': settings.CONTROLLERS['pox']['path'],
-                'port': settings.CONTROLLERS['pox']['port'],
-                'app': settings.CONTROLLERS['pox']['app'],
-                'process': None
-            },
-            'odl': {
-                'status': 'uninit',
-                'health': 'uninit',
-                'path': settings.CONTROLLERS['odl']['path'],
-                'port': settings.CONTROLLERS['odl']['port'],
-                'app': settings.CONTROLLERS['odl']['app'],
-                'process': None
-            }
-        }
-
-    def get_all_status(self):
-        """获取所有控制器的状态"""
-        return {
-            controller_id: {
-                'status': controller['status'],
-                'port': controller['port'],
-                'health': controller['health']
-            }
-            for controller_id, controller in self.controllers.items()
-        }
-
-    async def validate_paths(self):
-        """验证所有控制器路径"""
-        for controller_id, controller in self.controllers.items():
-            if not await self._check_path(controller['path']):
-                logger.warning(f"控制器 {controller_id} 路径不存在: {controller['path']}")
-
-    async def start_controller(self, controller_id: str):
-        """启动指定控制器"""
-        if controller_id not in self.controllers:
-            raise ValueError(f"未知的控制器: {controller_id}")
-        
-        controller = self.controllers[controller_id]
-        if controller['status'] == 'running':
-            logger.info(f"控制器 {controller_id} 已经在运行")
-            return {"status": "already_running"}
-        
-        try:
-            # 构建启动命令
-            cmd = f"{controller['path']}"
-            if controller['app']:
-                cmd += f" {controller['app']}"
-                
-            # 异步启动控制器进程
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            controller['process'] = process
-            controller['status'] = 'running'
-            
-            # 等待控制器初始化
-            await asyncio.sleep(2)
-            
-            # 启动后立即进行健康检查
-            try:
-                reader, writer = await asyncio.open_connection('127.0.0.1', controller['port'])
-                writer.close()
-                await writer.wait_closed()
-                controller['health'] = 'healthy'
-                logger.info(f"控制器 {controller_id} 已启动且健康")
-            except Exception as e:
-                controller['health'] = 'unhealthy'
-                logger.warning(f"控制器 {controller_id} 已启动但无法通过健康检查: {str(e)}")
-            
-            return {"status": "started", "health": controller['health']}
-        except Exception as e:
-            logger.error(f"启动控制器 {controller_id} 失败: {str(e)}")
-            controller['health'] = 'unhealthy'
-            return {"status": "error", "message": str(e)}
-
-    async def stop_controller(self, controller_id: str):
-        """停止指定控制器"""
-        if controller_id not in self.controllers:
-            raise ValueError(f"未知的控制器: {controller_id}")
-        
-        controller = self.controllers[controller_id]
-        if controller['status'] == 'stopped':
-            logger.info(f"控制器 {controller_id} 已经停止")
-            return {"status": "already_stopped"}
-        
-        try:
-            if controller_id == 'odl':
-                # ODL 特殊处理：使用 karaf 的 stop 命令
-                stop_cmd = f"{os.path.dirname(controller['path'])}/stop"
-                process = await asyncio.create_subprocess_shell(
-                    stop_cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await process.wait()
-            else:
-                # 其他控制器的常规停止方式
-                if controller['process']:
-                    controller['process'].terminate()
-                    await controller['process'].wait()
-                
-            controller['status'] = 'stopped'
-            controller['health'] = 'uninit'  # 停止时重置为 uninit
-            controller['process'] = None
-            logger.info(f"控制器 {controller_id} 已停止")
-            return {"status": "stopped"}
-        except Exception as e:
-            logger.error(f"停止控制器 {controller_id} 失败: {str(e)}")
-            return {"status": "error", "message": str(e)}
-
-    async def _check_path(self, path: str) -> bool:
-        """检查文件路径是否存在"""
-        try:
-            process = await asyncio.create_subprocess_shell(
-                f"test -f {path}",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await process.wait()
-            return process.returncode == 0
-        except Exception:
-            return False
-
-    async def health_check(self, controller_id: str):
-        """检查控制器健康状态"""
-        if controller_id not in self.controllers:
-            raise ValueError(f"未知的控制器: {controller_id}")
-        
-        controller = self.controllers[controller_id]
-        if controller['status'] == 'stopped':
-            return {"status": "stopped", "health": "uninit"}
-        
-        try:
-            # 检查端口是否可访问
-            try:
-                reader, writer = await asyncio.open_connection('127.0.0.1', controller['port'])
-                writer.close()
-                await writer.wait_closed()
-                controller['health'] = 'healthy'
-                return {"status": controller['status'], "health": "healthy"}
-            except Exception as e:
-                controller['health'] = 'unhealthy'
-                return {"status": controller['status'], "health": "unhealthy", "message": f"端口不可访问: {str(e)}"}
-        except Exception as e:
-            logger.error(f"控制器 {controller_id} 健康检查失败: {str(e)}")
-            controller['health'] = 'unhealthy'
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from config.dhr_config import DHR_CONFIG
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class ControllerManager:
+    def __init__(self):
+        self.controllers: Dict[str, dict] = {
+            'ryu': {
+                'status': 'uninit',  # 初始状态为 uninit
+                'health': 'uninit',  # 健康状态为 uninit
+                'path': settings.CONTROLLERS['ryu']['path'],
+                'port': settings.CONTROLLERS['ryu']['port'],
+                'app': settings.CONTROLLERS['ryu']['app'],
+                'process': None
+            },
+            'pox': {
+                'status': 'uninit',
+                'health': 'uninit',
+                'path': settings.CONTROLLERS['pox']['path'],
+                'port': settings.CONTROLLERS['pox']['port'],
+                'app': settings.CONTROLLERS['pox']['app'],
+                'process': None
+            },
+            'odl': {
+                'status': 'uninit',
+                'health': 'uninit',
+                'path': settings.CONTROLLERS['odl']['path'],
+                'port': settings.CONTROLLERS['odl']['port'],
+                'app': settings.CONTROLLERS['odl']['app'],
+                'process': None
+            }
+        }
+        self._listeners: List[Callable[[dict], None]] = []
+        # 切换时让交换机重连到新控制器的回调，参数为新控制器端口，返回 (已重连数, 交换机总数)
+        self.reconnect_handler: Optional[Callable[[int], Awaitable[Tuple[int, int]]]] = None
+        # 切换前把流表状态补齐到新控制器的回调，参数为新控制器ID
+        self.sync_handler: Optional[Callable[[str], Awaitable]] = None
+        self.active_controller: Optional[str] = None
+        self.switch_count = 0
+        self.last_switchover = float('-inf')
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """注册控制器状态变化的回调"""
+        self._listeners.append(callback)
+
+    def make_event(self, controller_id: str) -> dict:
+        """生成控制器状态事件"""
+        controller = self.controllers[controller_id]
+        return {
+            'type': 'controller',
+            'id': controller_id,
+            'status': controller['status'],
+            'health': controller['health'],
+            'port': controller['port']
+        }
+
+    def _notify(self, controller_id: str):
+        self._emit(self.make_event(controller_id))
+
+    def _emit(self, event: dict):
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"控制器状态通知失败: {str(e)}")
+
+    def get_active(self) -> Optional[str]:
+        """获取当前主控制器：最近一次切换的目标，否则取第一个运行中的控制器"""
+        if self.active_controller and self.controllers[self.active_controller]['status'] == 'running':
+            return self.active_controller
+        for controller_id, controller in self.controllers.items():
+            if controller['status'] == 'running':
+                return controller_id
+        return None
+
+    def get_all_status(self):
+        """获取所有控制器的状态"""
+        return {
+            controller_id: {
+                'status': controller['status'],
+                'port': controller['port'],
+                'health': controller['health']
+            }
+            for controller_id, controller in self.controllers.items()
+        }
+
+    async def validate_paths(self):
+        """验证所有控制器路径"""
+        for controller_id, controller in self.controllers.items():
+            if not await self._check_path(controller['path']):
+                logger.warning(f"控制器 {controller_id} 路径不存在: {controller['path']}")
+
+    async def start_controller(self, controller_id: str):
+        """启动指定控制器"""
+        with tracer.span('controller.start', controller=controller_id) as span:
+            result = await self._start_controller(controller_id)
+            span['attrs']['result'] = result['status']
+            return result
+
+    async def _start_controller(self, controller_id: str):
+        if controller_id not in self.controllers:
+            raise ValueError(f"未知的控制器: {controller_id}")
+        
+        controller = self.controllers[controller_id]
+        if controller['status'] == 'running':
+            logger.info(f"控制器 {controller_id} 已经在运行")
+            return {"status": "already_running"}
+        
+        try:
+            # 构建启动命令
+            cmd = f"{controller['path']}"
+            if controller['app']:
+                cmd += f" {controller['app']}"
+                
+            # 异步启动控制器进程
+            with tracer.span('start.spawn', controller=controller_id):
+                process = await asyncio.create_subprocess_shell(
+                    cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            controller['process'] = process
+            controller['status'] = 'running'
+            
+            # 等待控制器初始化
+            with tracer.span('start.init_wait', controller=controller_id):
+                await asyncio.sleep(2)
+            
+            # 启动后立即进行健康检查
+            with tracer.span('start.probe', controller=controller_id) as probe:
+                try:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', controller['port'])
+                    writer.close()
+                    await writer.wait_closed()
+                    controller['health'] = 'healthy'
+                    logger.info(f"控制器 {controller_id} 已启动且健康")
+                except Exception as e:
+                    controller['health'] = 'unhealthy'
+                    logger.warning(f"控制器 {controller_id} 已启动但无法通过健康检查: {str(e)}")
+                probe['attrs']['health'] = controller['health']
+            
+            self._notify(controller_id)
+            return {"status": "started", "health": controller['health']}
+        except Exception as e:
+            logger.error(f"启动控制器 {controller_id} 失败: {str(e)}")
+            controller['health'] = 'unhealthy'
+            self._notify(controller_id)
+            return {"status": "error", "message": str(e)}
+
+    async def stop_controller(self, controller_id: str):
+        """停止指定控制器"""
+        with tracer.span('controller.stop', controller=controller_id) as span:
+            result = await self._stop_controller(controller_id)
+            span['attrs']['result'] = result['status']
+            return result
+
+    async def _stop_controller(self, controller_id: str):
+        if controller_id not in self.controllers:
+            raise ValueError(f"未知的控制器: {controller_id}")
+        
+        controller = self.controllers[controller_id]
+        if controller['status'] == 'stopped':
+            logger.info(f"控制器 {controller_id} 已经停止")
+            return {"status": "already_stopped"}
+        
+        try:
+            if controller_id == 'odl':
+                # ODL 特殊处理：使用 karaf 的 stop 命令
+                with tracer.span('stop.odl_script', controller=controller_id):
+                    stop_cmd = f"{os.path.dirname(controller['path'])}/stop"
+                    process = await asyncio.create_subprocess_shell(
+                        stop_cmd,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+                    await process.wait()
+            else:
+                # 其他控制器的常规停止方式
+                if controller['process']:
+                    with tracer.span('stop.terminate', controller=controller_id):
+                        controller['process'].terminate()
+                        await controller['process'].wait()
+                
+            controller['status'] = 'stopped'
+            controller['health'] = 'uninit'  # 停止时重置为 uninit
+            controller['process'] = None
+            logger.info(f"控制器 {controller_id} 已停止")
+            self._notify(controller_id)
+            return {"status": "stopped"}
+        except Exception as e:
+            logger.error(f"停止控制器 {controller_id} 失败: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+    async def switchover(self, from_id: str, to_id: str):
+        """将主控制器从 from_id 切换到 to_id
+
+        先启动新控制器，再让交换机重连，最后停止旧控制器。新控制器健康检查
+        不通过或重连的交换机不足时回滚：交换机连回 from_id，停止本次启动的
+        新控制器，from_id 始终保持运行。
+        """
+        for controller_id in (from_id, to_id):
+            if controller_id not in self.controllers:
+                raise ValueError(f"未知的控制器: {controller_id}")
+        if from_id == to_id:
+            raise ValueError("切换前后的控制器不能相同")
+        if self.get_active() != from_id:
+            raise ValueError(f"控制器 {from_id} 不是运行中的主控制器")
+        remaining = self.last_switchover + DHR_CONFIG['switch_cooldown'] - time.monotonic()
+        if remaining > 0:
+            raise ValueError(f"切换冷却中，请在 {remaining:.0f}s 后重试")
+        # 切换开始即占用冷却时间，防止并发切换；中止时恢复
+        previous_switchover, self.last_switchover = self.last_switchover, time.monotonic()
+
+        with tracer.span('controller.switchover', source=from_id, target=to_id) as span:
+            started = await self.start_controller(to_id)
+            if started['status'] == 'error':
+                span['attrs']['result'] = 'error'
+                self.last_switchover = previous_switchover
+                return {"status": "error", "message": f"启动控制器 {to_id} 失败: {started.get('message')}"}
+            started_here = started['status'] == 'started'
+            if not started_here:
+                # 已在运行的控制器重新探测一次
+                await self.health_check(to_id)
+            if self.controllers[to_id]['health'] != 'healthy':
+                span['attrs']['result'] = 'aborted'
+                self.last_switchover = previous_switchover
+                return await self._abort_switchover(
+                    from_id, to_id, started_here, False, f"控制器 {to_id} 未通过健康检查"
+                )
+
+            if self.sync_handler:
+                with tracer.span('switchover.sync', target=to_id):
+                    try:
+                        await self.sync_handler(to_id)
+                    except Exception as e:
+                        logger.warning(f"切换前同步流表到 {to_id} 失败: {str(e)}")
+
+            connected = total = 0
+            if self.reconnect_handler:
+                with tracer.span('switchover.reconnect', target=to_id) as reconnect:
+                    try:
+                        connected, total = await self.reconnect_handler(self.controllers[to_id]['port'])
+                    except Exception as e:
+                        # 部分交换机可能已指向 to_id，回滚时全部连回
+                        span['attrs']['result'] = 'aborted'
+                        self.last_switchover = previous_switchover
+                        reason = f"交换机重连到 {to_id} 失败: {str(e)}"
+                    else:
+                        reason = None
+                    reconnect['attrs']['connected'] = connected
+                    reconnect['attrs']['total'] = total
+                if reason:
+                    return await self._abort_switchover(from_id, to_id, started_here, True, reason)
+            if total and connected < total * DHR_CONFIG['switch_min_reconnect']:
+                span['attrs']['result'] = 'aborted'
+                self.last_switchover = previous_switchover
+                return await self._abort_switchover(
+                    from_id, to_id, started_here, True, f"只有 {connected}/{total} 台交换机重连到 {to_id}"
+                )
+
+            stopped = await self.stop_controller(from_id)
+            self.active_controller = to_id
+            self.switch_count += 1
+            duration_ms = (time.time() - span['start']) * 1000
+            span['attrs']['result'] = 'switched'
+
+        logger.info(f"主控制器已从 {from_id} 切换到 {to_id}，耗时 {duration_ms:.0f}ms")
+        self._emit({
+            'type': 'switchover',
+            'from': from_id,
+            'to': to_id,
+            'count': self.switch_count,
+            'duration_ms': duration_ms
+        })
+        return {
+            "status": "switched",
+            "active": to_id,
+            "connected_switches": connected,
+            "previous": stopped['status'],
+            "duration_ms": round(duration_ms, 1)
+        }
+
+    async def _abort_switchover(self, from_id: str, to_id: str, started_here: bool,
+                                reconnected: bool, reason: str):
+        """回滚未完成的切换"""
+        logger.warning(f"切换到 {to_id} 已中止: {reason}")
+        with tracer.span('switchover.rollback', source=from_id, target=to_id):
+            if reconnected and self.reconnect_handler:
+                try:
+                    await self.reconnect_handler(self.controllers[from_id]['port'])
+                except Exception as e:
+                    logger.error(f"交换机重连回 {from_id} 失败: {str(e)}")
+            if started_here:
+                await self.stop_controller(to_id)
+        return {"status": "aborted", "active": from_id, "message": reason}
+
+    async def _check_path(self, path: str) -> bool:
+        """检查文件路径是否存在"""
+        try:
+            process = await asyncio.create_subprocess_shell(
+                f"test -f {path}",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            await process.wait()
+            return process.returncode == 0
+        except Exception:
+            return False
+
+    async def health_check(self, controller_id: str):
+        """检查控制器健康状态"""
+        if controller_id not in self.controllers:
+            raise ValueError(f"未知的控制器: {controller_id}")
+        
+        controller = self.controllers[controller_id]
+        if controller['status'] == 'stopped':
+            return {"status": "stopped", "health": "uninit"}
+        
+        try:
+            # 检查端口是否可访问
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', controller['port'])
+                writer.close()
+                await writer.wait_closed()
+                controller['health'] = 'healthy'
+                self._notify(controller_id)
+                return {"status": controller['status'], "health": "healthy"}
+            except Exception as e:
+                controller['health'] = 'unhealthy'
+                self._notify(controller_id)
+                return {"status": controller['status'], "health": "unhealthy", "message": f"端口不可访问: {str(e)}"}
+        except Exception as e:
+            logger.error(f"控制器 {controller_id} 健康检查失败: {str(e)}")
+            controller['health'] = 'unhealthy'
+            self._notify(controller_id)
             return {"status": controller['status'], "health": "unhealthy", "message": str(e)}
\ No newline at end of file
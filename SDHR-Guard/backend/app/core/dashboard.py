@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class DashboardSummary:
+    """仪表盘摘要（物化视图）
+
+    由控制器、健康检查、拓扑和流量统计的更新事件增量维护，
+    请求时只返回预先编码好的 JSON，不再实时重新计算。
+    """
+    def __init__(self, max_alerts: int = 20):
+        self.controllers: Dict[str, dict] = {}
+        self.topology = {'host_count': 0, 'switch_count': 0, 'link_count': 0}
+        self.switches: Dict[str, dict] = {}
+        self.traffic = {'bytes_rate': 0.0, 'packets_rate': 0.0, 'flows': 0}
+        self.alerts = deque(maxlen=max_alerts)
+        self.primary: Optional[str] = None
+        self.switch_count = 0
+        self.version = 0
+        self.encoded = b'{}'
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._encode()
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def attach(self, controller_manager=None, topology_manager=None, flow_monitor=None):
+        """订阅各管理器的更新事件，并用当前状态初始化摘要"""
+        if controller_manager is not None:
+            controller_manager.add_listener(self.publish)
+            for controller_id in controller_manager.controllers:
+                self._apply(controller_manager.make_event(controller_id))
+        if topology_manager is not None:
+            topology_manager.add_listener(self.publish)
+            self._apply(topology_manager.make_event())
+        if flow_monitor is not None:
+            flow_monitor.add_listener(self.publish)
+        self._encode()
+
+    def publish(self, event: dict):
+        """接收更新事件；后台任务未启动时直接同步应用"""
+        if self._queue is None:
+            if self._apply(event):
+                self._encode()
+        else:
+            self._queue.put_nowait(event)
+
+    async def start(self):
+        """启动后台维护任务"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台维护任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+    async def _run(self):
+        while True:
+            event = await self._queue.get()
+            try:
+                changed = self._apply(event)
+                # 合并积压的事件，一批只编码一次
+                while not self._queue.empty():
+                    changed = self._apply(self._queue.get_nowait()) or changed
+                # 状态没有变化时不重新编码，ETag 保持不变
+                if changed:
+                    self._encode()
+            except Exception as e:
+                logger.error(f"更新仪表盘摘要失败: {str(e)}")
+
+    def _apply(self, event: dict) -> bool:
+        """应用事件，返回摘要是否变化"""
+        handler = getattr(self, f"_on_{event.get('type')}", None)
+        return bool(handler is not None and handler(event))
+
+    def _on_controller(self, event: dict):
+        controller_id = event['id']
+        previous = self.controllers.get(controller_id, {})
+        current = {
+            'status': event['status'],
+            'health': event['health'],
+            'port': event['port']
+        }
+        if current == previous:
+            # 周期性健康检查大多不改变状态
+            return False
+        self.controllers[controller_id] = current
+
+        if not previous:
+            return True
+        if current['health'] == 'unhealthy' and previous.get('health') != 'unhealthy':
+            self._add_alert('error', controller_id, f"控制器 {controller_id} 健康检查失败")
+        elif current['health'] == 'healthy' and previous.get('health') == 'unhealthy':
+            self._add_alert('success', controller_id, f"控制器 {controller_id} 已恢复")
+        if current['status'] == 'stopped' and previous.get('status') == 'running':
+            self._add_alert('warning', controller_id, f"控制器 {controller_id} 已停止")
+        elif current['status'] == 'running' and previous.get('status') != 'running':
+            self._add_alert('info', controller_id, f"控制器 {controller_id} 已启动")
+        return True
+
+    def _on_switchover(self, event: dict):
+        self.primary = event['to']
+        self.switch_count = event['count']
+        self._add_alert(
+            'info', event['to'],
+            f"主控制器已从 {event['from']} 切换到 {event['to']}（{event['duration_ms']:.0f}ms）"
+        )
+        return True
+
+    def _on_topology(self, event: dict):
+        current = {key: event.get(key, 0) for key in self.topology}
+        if current == self.topology:
+            return False
+        self.topology = current
+        return True
+
+    def _subtract(self, previous: dict):
+        """从全网流量中减去某台交换机上一次的贡献"""
+        self.traffic['bytes_rate'] -= previous['bytes_rate']
+        self.traffic['packets_rate'] -= previous['packets_rate']
+        self.traffic['flows'] -= previous['flows']
+
+    def _on_flow(self, event: dict):
+        switch_id = event['switch_id']
+        previous = self.switches.get(switch_id)
+        bytes_rate = packets_rate = 0.0
+        if previous:
+            elapsed = event['timestamp'] - previous['timestamp']
+            if elapsed > 0:
+                # 计数器回绕或交换机重启时按0处理
+                bytes_rate = max(event['bytes'] - previous['bytes'], 0) / elapsed
+                packets_rate = max(event['packets'] - previous['packets'], 0) / elapsed
+            self._subtract(previous)
+
+        self.switches[switch_id] = {
+            'timestamp': event['timestamp'],
+            'bytes': event['bytes'],
+            'packets': event['packets'],
+            'flows': event['flows'],
+            'bytes_rate': bytes_rate,
+            'packets_rate': packets_rate
+        }
+        self.traffic['bytes_rate'] += bytes_rate
+        self.traffic['packets_rate'] += packets_rate
+        self.traffic['flows'] += event['flows']
+        # 只比较摘要中展示的（取整后的）值
+        return previous is None or (
+            round(previous['bytes_rate'], 2), round(previous['packets_rate'], 2), previous['flows']
+        ) != (round(bytes_rate, 2), round(packets_rate, 2), event['flows'])
+
+    def _on_switch_removed(self, event: dict):
+        previous = self.switches.pop(event['switch_id'], None)
+        if previous is None:
+            return False
+        self._subtract(previous)
+        return True
+
+    def _add_alert(self, level: str, source: str, message: str):
+        self.alerts.appendleft({
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'level': level,
+            'source': source,
+            'message': message
+        })
+
+    def _encode(self):
+        running = [cid for cid, c in self.controllers.items() if c['status'] == 'running']
+        primary = self.primary if self.primary in running else (running[0] if running else None)
+        summary = {
+            'version': self.version + 1,
+            'updated_at': time.time(),
+            'controllers': {
+                'total': len(self.controllers),
+                'running': len(running),
+                'healthy': sum(1 for c in self.controllers.values() if c['health'] == 'healthy'),
+                'active': running,
+                # 备用控制器：运行中但不是主控制器
+                'standby': [cid for cid in running if cid != primary],
+                'primary': primary,
+                'switch_count': self.switch_count,
+                'states': self.controllers
+            },
+            'topology': self.topology,
+            'traffic': {
+                'bytes_rate': round(self.traffic['bytes_rate'], 2),
+                'packets_rate': round(self.traffic['packets_rate'], 2),
+                'flows': self.traffic['flows'],
+                'switches': {
+                    switch_id: {
+                        'bytes_rate': round(s['bytes_rate'], 2),
+                        'packets_rate': round(s['packets_rate'], 2),
+                        'flows': s['flows']
+                    }
+                    for switch_id, s in self.switches.items()
+                }
+            },
+            'alerts': list(self.alerts)
+        }
+        self.encoded = json.dumps(summary, ensure_ascii=False).encode('utf-8')
+        self.version += 1
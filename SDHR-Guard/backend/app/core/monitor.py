@@ -1,86 +1,228 @@
-import asyncio
-import logging
-from typing import Dict, List
-from datetime import datetime
-from mininet.net import Mininet
-
-logger = logging.getLogger(__name__)
-
-class FlowMonitor:
-    def __init__(self):
-        self.flow_stats: Dict[str, List] = {
-            'timestamps': [],
-            'bytes': [],
-            'packets': [],
-            'flows': []
-        }
-        self.max_data_points = 100
-        
-    async def collect_stats(self, switch_id: str):
-        """收集指定交换机的流量统计"""
-        try:
-            net = Mininet.get()
-            switch = net.getNodeByName(switch_id)
-            
-            if not switch:
-                raise ValueError(f"交换机 {switch_id} 不存在")
-            
-            # 获取端口统计
-            port_stats = await self._get_port_stats(switch)
-            # 获取流表统计
-            flow_stats = await self._get_flow_stats(switch)
-            
-            # 更新统计数据
-            timestamp = datetime.now().strftime('%H:%M:%S')
-            self.flow_stats['timestamps'].append(timestamp)
-            self.flow_stats['bytes'].append(port_stats['total_bytes'])
-            self.flow_stats['packets'].append(port_stats['total_packets'])
-            self.flow_stats['flows'].append(len(flow_stats))
-            
-            # 保持数据点数量限制
-            if len(self.flow_stats['timestamps']) > self.max_data_points:
-                for key in self.flow_stats:
-                    self.flow_stats[key] = self.flow_stats[key][-self.max_data_points:]
-            
-            return {
-                'bytes': port_stats['total_bytes'],
-                'packets': port_stats['total_packets'],
-                'flows': len(flow_stats)
-            }
-        except Exception as e:
-            logger.error(f"获取流量统计失败: {str(e)}")
-            raise
-            
-    async def _get_port_stats(self, switch):
-        """获取端口统计信息"""
-        try:
-            stats = {'total_bytes': 0, 'total_packets': 0}
-            
-            # 使用dpctl获取端口统计
-            output = switch.dpctl('dump-ports')
-            lines = output.split('\n')
-            
-            for line in lines:
-                if 'rx bytes=' in line:
-                    stats['total_bytes'] += int(line.split('bytes=')[1].split()[0])
-                if 'rx pkts=' in line:
-                    stats['total_packets'] += int(line.split('pkts=')[1].split()[0])
-                    
-            return stats
-        except Exception as e:
-            logger.error(f"获取端口统计失败: {str(e)}")
-            return {'total_bytes': 0, 'total_packets': 0}
-            
-    async def _get_flow_stats(self, switch):
-        """获取流表统计信息"""
-        try:
-            # 使用dpctl获取流表
-            output = switch.dpctl('dump-flows')
-            return output.split('\n')[1:]  # 去掉头部
-        except Exception as e:
-            logger.error(f"获取流表统计失败: {str(e)}")
-            return []
-        
-    def get_flow_history(self):
-        """获取历史流量数据"""
-        return self.flow_stats
\ No newline at end of file
+import asyncio
+import logging
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+from config.dhr_config import DHR_CONFIG
+from app.core.downsample import METHODS
+from app.core.flow_table import FlowTableStore
+
+logger = logging.getLogger(__name__)
+
+# dump-ports 的接收计数行，如 "port  1: rx pkts=8, bytes=648, drop=0, ..."
+_RX_COUNTERS = re.compile(r'rx pkts=(\d+), bytes=(\d+)')
+
+def _new_series() -> Dict[str, array]:
+    """按列存储的历史数据，时间戳为 epoch 秒"""
+    return {
+        'timestamps': array('d'),
+        'bytes': array('q'),
+        'packets': array('q'),
+        'flows': array('q')
+    }
+
+def _append(series: Dict[str, array], timestamp: float, sample: Dict[str, int], limit: int):
+    series['timestamps'].append(timestamp)
+    for key, value in sample.items():
+        series[key].append(value)
+    # 超出10%后批量裁剪，避免每次都移动整个数组
+    excess = len(series['timestamps']) - limit
+    if excess > limit // 10:
+        for values in series.values():
+            del values[:excess]
+
+class FlowMonitor:
+    def __init__(self):
+        # 各交换机的历史，以及全网汇总（各交换机最新计数之和，每 metrics_interval 一个点）
+        self.flow_stats = {'total': _new_series(), 'switches': {}}
+        self.max_data_points = DHR_CONFIG['monitoring']['history_max_points']
+        self.min_switch_points = DHR_CONFIG['monitoring']['history_min_switch_points']
+        self.total_resolution = DHR_CONFIG['monitoring']['metrics_interval']
+        self._latest: Dict[str, Dict[str, int]] = {}
+        self._totals = {'bytes': 0, 'packets': 0, 'flows': 0}
+        self.default_query_points = 100
+        self.default_query_window = 3600  # 未指定起始时间时查询最近1小时
+        # 各交换机的逐流统计
+        self.flow_tables = FlowTableStore()
+        # 同一交换机的流表刷新串行执行
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._listeners: List[Callable[[dict], None]] = []
+        self.topology_manager = None
+
+    def attach(self, topology_manager):
+        """交换机从拓扑管理器持有的 Mininet 网络中查找"""
+        self.topology_manager = topology_manager
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """注册流量统计更新的回调"""
+        self._listeners.append(callback)
+
+    def _notify(self, event: dict):
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"流量统计通知失败: {str(e)}")
+        
+    async def collect_stats(self, switch_id: str):
+        """收集指定交换机的流量统计"""
+        try:
+            net = self.topology_manager.net if self.topology_manager else None
+            if net is None:
+                raise ValueError("Mininet网络未启动")
+            if switch_id not in net:
+                raise ValueError(f"交换机 {switch_id} 不存在")
+            switch = net.get(switch_id)
+            
+            # 获取端口统计
+            port_stats = await self._get_port_stats(switch)
+            # 获取流表统计
+            flow_stats = await self._get_flow_stats(switch)
+            
+            # 更新统计数据
+            timestamp = time.time()
+            added, removed = await self._refresh_table(switch_id, flow_stats, timestamp)
+            if added or removed:
+                self._notify({
+                    'type': 'flow_delta',
+                    'switch_id': switch_id,
+                    'dpid': switch.dpid,
+                    'added': added,
+                    'removed': removed
+                })
+            self._record(switch_id, timestamp, {
+                'bytes': port_stats['total_bytes'],
+                'packets': port_stats['total_packets'],
+                'flows': len(flow_stats)
+            })
+            
+            self._notify({
+                'type': 'flow',
+                'switch_id': switch_id,
+                'timestamp': timestamp,
+                'bytes': port_stats['total_bytes'],
+                'packets': port_stats['total_packets'],
+                'flows': len(flow_stats)
+            })
+            
+            return {
+                'bytes': port_stats['total_bytes'],
+                'packets': port_stats['total_packets'],
+                'flows': len(flow_stats)
+            }
+        except Exception as e:
+            logger.error(f"获取流量统计失败: {str(e)}")
+            raise
+            
+    def _record(self, switch_id: str, timestamp: float, sample: Dict[str, int]):
+        """写入交换机历史并更新全网汇总"""
+        switches = self.flow_stats['switches']
+        series = switches.get(switch_id)
+        if series is None:
+            series = switches[switch_id] = _new_series()
+        # 各交换机分摊总保留点数，交换机增多时总内存不随之增长
+        _append(series, timestamp, sample, max(self.max_data_points // len(switches), self.min_switch_points))
+
+        previous = self._latest.get(switch_id)
+        self._latest[switch_id] = sample
+        for key, value in sample.items():
+            self._totals[key] += value - (previous[key] if previous else 0)
+        total = self.flow_stats['total']
+        if total['timestamps'] and timestamp - total['timestamps'][-1] < self.total_resolution:
+            # 同一时间片内的采集合并到最后一个点
+            for key, value in self._totals.items():
+                total[key][-1] = value
+        else:
+            _append(total, timestamp, self._totals, self.max_data_points)
+
+    def forget_switch(self, switch_id: str):
+        """交换机移除后丢弃其历史，并从汇总中扣除"""
+        self.flow_stats['switches'].pop(switch_id, None)
+        previous = self._latest.pop(switch_id, None)
+        if previous:
+            for key, value in previous.items():
+                self._totals[key] -= value
+        self._notify({'type': 'switch_removed', 'switch_id': switch_id})
+
+    async def _refresh_table(self, switch_id: str, lines: List[str], timestamp: float):
+        """在线程池中解析流表，事件循环只做最后的替换，避免大流表阻塞API"""
+        table = self.flow_tables.table(switch_id)
+        lock = self._refresh_locks.setdefault(switch_id, asyncio.Lock())
+        async with lock:
+            state = await asyncio.get_running_loop().run_in_executor(None, table.build, lines, timestamp)
+            return table.install(state)
+
+    async def _get_port_stats(self, switch):
+        """获取端口统计信息"""
+        try:
+            stats = {'total_bytes': 0, 'total_packets': 0}
+            
+            # 使用dpctl获取端口统计
+            output = switch.dpctl('dump-ports')
+            for packets, total_bytes in _RX_COUNTERS.findall(output):
+                stats['total_packets'] += int(packets)
+                stats['total_bytes'] += int(total_bytes)
+                    
+            return stats
+        except Exception as e:
+            logger.error(f"获取端口统计失败: {str(e)}")
+            return {'total_bytes': 0, 'total_packets': 0}
+            
+    async def _get_flow_stats(self, switch):
+        """获取流表统计信息"""
+        try:
+            # 使用dpctl获取流表
+            output = switch.dpctl('dump-flows')
+            return output.split('\n')[1:]  # 去掉头部
+        except Exception as e:
+            logger.error(f"获取流表统计失败: {str(e)}")
+            return []
+        
+    def get_flow_history(self, start: Optional[float] = None, end: Optional[float] = None,
+                         max_points: Optional[int] = None, method: str = 'lttb',
+                         switch_id: Optional[str] = None):
+        """获取历史流量数据
+
+        按 [start, end] 时间范围截取，并降采样到最多 max_points 个点。
+        未指定 end 时取当前时间，未指定 start 时取 end 之前 default_query_window 秒。
+        未指定 switch_id 时返回全网汇总。
+        降采样以字节数序列选点，其余序列取相同下标以保持对齐。
+        """
+        if method not in METHODS:
+            raise ValueError(f"未知的降采样方法: {method}")
+        if switch_id is None:
+            history = self.flow_stats['total']
+        elif switch_id in self.flow_stats['switches']:
+            history = self.flow_stats['switches'][switch_id]
+        else:
+            raise ValueError(f"交换机 {switch_id} 没有历史数据")
+        max_points = max_points or self.default_query_points
+
+        if end is None:
+            end = time.time()
+        if start is None:
+            start = end - self.default_query_window
+        timestamps = history['timestamps']
+        lo = bisect_left(timestamps, start)
+        hi = bisect_right(timestamps, end)
+
+        series = {key: values[lo:hi] for key, values in history.items()}
+        xs = series['timestamps']
+        if len(xs) > max_points:
+            indices = METHODS[method](xs, series['bytes'], max_points)
+            series = {key: [values[i] for i in indices] for key, values in series.items()}
+        else:
+            series = {key: values.tolist() for key, values in series.items()}
+
+        xs = series['timestamps']
+        fmt = '%m-%d %H:%M' if xs and xs[-1] - xs[0] > 86400 else '%H:%M:%S'
+        series['epochs'] = xs
+        series['timestamps'] = [datetime.fromtimestamp(ts).strftime(fmt) for ts in xs]
+        return series
+
+    def get_top_flows(self, k: int = 10, by: str = 'bytes', switch_id: Optional[str] = None):
+        """获取字节数/速率/增长最大的流表项"""
+        return self.flow_tables.top(k, by, switch_id)
\ No newline at end of file
@@ -0,0 +1,486 @@
+"""拓扑图的路径索引
+
+从 TopologyGraph 构建 CSR 邻接表（offsets/targets/edge_of 三个数组）和
+链路端口表，提供最短路径、k 条最短路径（Yen）和链路不相交路径
+（单位容量最小费用流）查询，路径长度按跳数计算，主机只作为端点。
+
+结果按查询缓存，订阅拓扑增量后只失效受影响的部分：
+    链路断开/删除：只失效以该链路为树边的 BFS 树，以及路径中含该链路的缓存项
+    链路恢复/新增：BFS 树仅当链路两端距离差大于 1 时失效；k 路径和不相交
+                  路径仅当经过新链路的路径长度下界小于缓存项的阈值（第 k 条
+                  路径的跳数 / 最后一次增广的代价）时失效
+节点和链路编号只增不减（删除留空位），因此缓存中的下标在结构变化后仍然有效。
+BFS 树只保存距离、父链路和下一跳三个数组，按最近使用淘汰，至多 max_trees 棵；
+单条最短路径在查询时沿父链路展开，不缓存展开结果；全部节点对的跳数和下一跳
+由 all_pairs 直接返回树中的数组。
+"""
+import heapq
+import logging
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_INF = float('inf')
+
+class PathIndex:
+    """基于 CSR 邻接表的路径查询和缓存"""
+    def __init__(self, graph=None, max_entries: int = 100000, max_trees: int = 1024):
+        self.max_entries = max_entries
+        self.max_trees = max_trees
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0, 'rebuilds': 0}
+        self._reset()
+        if graph is not None:
+            self.attach(graph)
+
+    def _reset(self):
+        self.names: List[Optional[str]] = []       # 节点下标 -> 名称，删除后为 None
+        self.transit = bytearray()                 # 交换机可作为中间节点
+        self._node_ids: Dict[str, int] = {}
+        # 链路下标 -> (端点u, 端点v, u侧端口, v侧端口)，即端口表；删除后为 None
+        self.edges: List[Optional[Tuple[int, int, str, str]]] = []
+        self.alive = bytearray()
+        self._edge_ids: Dict[str, int] = {}
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        self.edge_of = array('i')
+        self._dirty = True
+        # 源节点 -> (距离, 父链路, 下一跳节点)，按最近使用排序
+        self._trees: 'OrderedDict[int, Tuple[array, array, array]]' = OrderedDict()
+        # ('k'|'disjoint', 源, 目的, k) -> (结果, 失效阈值, 使用的链路)
+        self._multi: Dict[tuple, Tuple[List[dict], float, Set[int]]] = {}
+        self._edge_refs: Dict[int, Set[tuple]] = {}
+
+    def attach(self, graph):
+        """从拓扑图全量加载，并订阅之后的增量"""
+        self.load(graph)
+        graph.subscribe(lambda delta: self.apply(delta, graph))
+
+    def load(self, graph):
+        self._reset()
+        for node in graph.nodes.values():
+            self._add_node(node)
+        for link in graph.links.values():
+            self._add_edge(link, graph)
+
+    def apply(self, delta: dict, graph):
+        """应用一条拓扑增量，失效受影响的缓存"""
+        changes = delta['changes']
+        if changes.get('reload'):
+            self.load(graph)
+            return
+        for link_id in changes.get('removed_links', ()):
+            self._remove_edge(link_id)
+        for name in changes.get('removed_nodes', ()):
+            self._remove_node(name)
+        for node in changes.get('nodes', ()):
+            self._add_node(node)
+        for link in changes.get('links', ()):
+            edge = self._edge_ids.get(link['id'])
+            if edge is None:
+                self._add_edge(link, graph)
+            elif (link['status'] == 'up') != bool(self.alive[edge]):
+                if link['status'] == 'up':
+                    self._edge_gained(edge)
+                    self.alive[edge] = 1
+                else:
+                    self.alive[edge] = 0
+                    self._edge_lost(edge)
+
+    # ---- 结构维护 ----
+
+    def _add_node(self, node: dict):
+        if node['id'] in self._node_ids:
+            return
+        self._node_ids[node['id']] = len(self.names)
+        self.names.append(node['id'])
+        self.transit.append(node['type'] == 'switch')
+        self._dirty = True
+
+    def _remove_node(self, name: str):
+        index = self._node_ids.pop(name, None)
+        if index is None:
+            return
+        self.names[index] = None
+        if self._trees.pop(index, None) is not None:
+            self.stats['invalidated'] += 1
+        for key in [key for key in self._multi if index in (key[1], key[2])]:
+            self._drop(key)
+
+    def _add_edge(self, link: dict, graph):
+        u = self._node_ids.get(link['source'])
+        v = self._node_ids.get(link['target'])
+        if u is None or v is None or link['id'] in self._edge_ids:
+            return
+        edge = len(self.edges)
+        self._edge_ids[link['id']] = edge
+        self.edges.append((u, v, link['source_port'], link['target_port']))
+        self.alive.append(0)
+        self._dirty = True
+        if link['status'] == 'up':
+            self._edge_gained(edge)
+            self.alive[edge] = 1
+
+    def _remove_edge(self, link_id: str):
+        edge = self._edge_ids.pop(link_id, None)
+        if edge is None:
+            return
+        if self.alive[edge]:
+            self.alive[edge] = 0
+            self._edge_lost(edge)
+        # 已删除的链路在 CSR 中被 alive 屏蔽，不必立即重建
+        self.edges[edge] = None
+
+    def _rebuild(self):
+        """按当前链路重建 CSR 邻接表"""
+        n = len(self.names)
+        offsets = array('i', [0]) * (n + 1)
+        for edge in self.edges:
+            if edge is not None:
+                offsets[edge[0] + 1] += 1
+                offsets[edge[1] + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        cursor = array('i', offsets)
+        targets = array('i', [0]) * offsets[n]
+        edge_of = array('i', [0]) * offsets[n]
+        for index, edge in enumerate(self.edges):
+            if edge is None:
+                continue
+            u, v = edge[0], edge[1]
+            targets[cursor[u]], edge_of[cursor[u]] = v, index
+            cursor[u] += 1
+            targets[cursor[v]], edge_of[cursor[v]] = u, index
+            cursor[v] += 1
+        self.offsets, self.targets, self.edge_of = offsets, targets, edge_of
+        self._dirty = False
+        self.stats['rebuilds'] += 1
+
+    # ---- 选择性失效 ----
+
+    @staticmethod
+    def _dist(dist: array, index: int) -> float:
+        # 树建立之后新增的节点视为不可达
+        if index >= len(dist) or dist[index] < 0:
+            return _INF
+        return dist[index]
+
+    def _edge_gained(self, edge: int):
+        """链路即将可用：在更新前用旧的 BFS 树判断哪些缓存会变化"""
+        u, v = self.edges[edge][0], self.edges[edge][1]
+        for key, (_, threshold, _) in list(self._multi.items()):
+            source_tree, target_tree = self._trees.get(key[1]), self._trees.get(key[2])
+            if source_tree is None or target_tree is None:
+                self._drop(key)
+                continue
+            ds, dt = source_tree[0], target_tree[0]
+            # 经过新链路的简单路径长度下界
+            bound = min(self._dist(ds, u) + self._dist(dt, v), self._dist(ds, v) + self._dist(dt, u)) + 1
+            if bound < threshold:
+                self._drop(key)
+        for source, (dist, _, _) in list(self._trees.items()):
+            du, dv = self._dist(dist, u), self._dist(dist, v)
+            if du != dv and (du == _INF or dv == _INF or abs(du - dv) > 1):
+                del self._trees[source]
+                self.stats['invalidated'] += 1
+
+    def _edge_lost(self, edge: int):
+        """链路不可用：只失效用到它的缓存"""
+        u, v = self.edges[edge][0], self.edges[edge][1]
+        for source, (_, parent, _) in list(self._trees.items()):
+            if (u < len(parent) and parent[u] == edge) or (v < len(parent) and parent[v] == edge):
+                del self._trees[source]
+                self.stats['invalidated'] += 1
+        for key in list(self._edge_refs.get(edge, ())):
+            self._drop(key)
+
+    def _drop(self, key: tuple, evicted: bool = False):
+        entry = self._multi.pop(key, None)
+        if entry is None:
+            return
+        for edge in entry[2]:
+            refs = self._edge_refs.get(edge)
+            if refs is not None:
+                refs.discard(key)
+                if not refs:
+                    del self._edge_refs[edge]
+        if not evicted:
+            self.stats['invalidated'] += 1
+
+    def _store(self, key: tuple, paths: List[dict], threshold: float, edges: Set[int]):
+        if len(self._multi) >= self.max_entries:
+            self._drop(next(iter(self._multi)), evicted=True)
+        self._multi[key] = (paths, threshold, edges)
+        for edge in edges:
+            self._edge_refs.setdefault(edge, set()).add(key)
+
+    # ---- 搜索 ----
+
+    def _tree(self, source: int) -> Tuple[array, array, array]:
+        tree = self._trees.get(source)
+        if tree is not None:
+            self._trees.move_to_end(source)
+            return tree
+        self._ensure()
+        n = len(self.names)
+        offsets, targets, edge_of, alive, transit = self.offsets, self.targets, self.edge_of, self.alive, self.transit
+        dist = array('i', [-1]) * n
+        parent = array('i', [-1]) * n
+        following_hop = array('i', [-1]) * n
+        dist[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            following = []
+            for u in frontier:
+                for i in range(offsets[u], offsets[u + 1]):
+                    edge = edge_of[i]
+                    if alive[edge]:
+                        v = targets[i]
+                        if dist[v] < 0:
+                            dist[v] = depth
+                            parent[v] = edge
+                            following_hop[v] = v if u == source else following_hop[u]
+                            if transit[v]:
+                                following.append(v)
+            frontier = following
+        if len(self._trees) >= self.max_trees:
+            self._trees.popitem(last=False)
+        tree = self._trees[source] = (dist, parent, following_hop)
+        return tree
+
+    def _ensure(self):
+        if self._dirty:
+            self._rebuild()
+
+    def _search(self, source: int, target: int, banned_edges: Set[int], banned_nodes: Set[int]) -> Optional[List[int]]:
+        """带禁用链路/节点的 BFS，返回链路序列"""
+        offsets, targets, edge_of, alive, transit = self.offsets, self.targets, self.edge_of, self.alive, self.transit
+        parent = {source: -1}
+        frontier = [source]
+        while frontier:
+            following = []
+            for u in frontier:
+                for i in range(offsets[u], offsets[u + 1]):
+                    edge = edge_of[i]
+                    v = targets[i]
+                    if not alive[edge] or edge in banned_edges or v in parent or v in banned_nodes:
+                        continue
+                    parent[v] = edge
+                    if v == target:
+                        return self._unwind(parent, source, target)
+                    if transit[v]:
+                        following.append(v)
+            frontier = following
+        return None
+
+    def _unwind(self, parent, source: int, target: int) -> List[int]:
+        path = []
+        node = target
+        while node != source:
+            edge = parent[node]
+            path.append(edge)
+            u, v = self.edges[edge][0], self.edges[edge][1]
+            node = u if v == node else v
+        path.reverse()
+        return path
+
+    def _nodes(self, source: int, path: List[int]) -> List[int]:
+        nodes = [source]
+        for edge in path:
+            u, v = self.edges[edge][0], self.edges[edge][1]
+            nodes.append(v if u == nodes[-1] else u)
+        return nodes
+
+    def _describe(self, source: int, path: List[int]) -> dict:
+        """展开为节点序列和逐跳出端口"""
+        nodes = self._nodes(source, path)
+        hops = []
+        for node, edge in zip(nodes, path):
+            u, _, u_port, v_port = self.edges[edge]
+            hops.append({'node': self.names[node], 'port': u_port if u == node else v_port})
+        return {'nodes': [self.names[node] for node in nodes], 'hops': hops, 'length': len(path)}
+
+    def _index(self, name: str) -> int:
+        index = self._node_ids.get(name)
+        if index is None:
+            raise ValueError(f"未知节点: {name}")
+        return index
+
+    # ---- 查询 ----
+
+    def shortest_path(self, source: str, target: str) -> Optional[dict]:
+        """最短路径，不可达时返回 None"""
+        s, t = self._index(source), self._index(target)
+        self.stats['hits' if s in self._trees else 'misses'] += 1
+        dist, parent, _ = self._tree(s)
+        if s == t:
+            return self._describe(s, [])
+        if t < len(dist) and dist[t] > 0:
+            return self._describe(s, self._unwind(parent, s, t))
+        return None
+
+    def distance(self, source: str, target: str) -> Optional[int]:
+        """最短跳数，不可达时返回 None"""
+        dist = self._tree(self._index(source))[0]
+        d = self._dist(dist, self._index(target))
+        return None if d == _INF else int(d)
+
+    def all_pairs(self) -> Dict[str, Tuple[array, array]]:
+        """全部节点对的最短跳数和下一跳（紧凑形式）
+
+        返回 {源: (距离, 下一跳)}，两个数组按 names 中的节点下标索引：距离 -1
+        表示不可达，下一跳为路径上第二个节点的下标。数组即缓存中的 BFS 树，
+        调用方不得修改；节点数不超过 max_trees 时重复查询只需查表。
+        """
+        result = {}
+        for name, index in self._node_ids.items():
+            dist, _, following_hop = self._tree(index)
+            result[name] = (dist, following_hop)
+        return result
+
+    def k_shortest_paths(self, source: str, target: str, k: int) -> List[dict]:
+        """按跳数排序的 k 条无环路径（Yen 算法）"""
+        s, t = self._index(source), self._index(target)
+        key = ('k', s, t, k)
+        entry = self._multi.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry[0]
+        self.stats['misses'] += 1
+        # 失效判断需要两端的 BFS 树
+        self._ensure()
+        dist, parent, _ = self._tree(s)
+        self._tree(t)
+        found: List[List[int]] = []
+        if s != t and t < len(dist) and dist[t] > 0:
+            found.append(self._unwind(parent, s, t))
+        candidates: List[tuple] = []
+        seen = {tuple(path) for path in found}
+        counter = 0
+        while found and len(found) < k:
+            previous = found[-1]
+            nodes = self._nodes(s, previous)
+            for i in range(len(previous)):
+                root = previous[:i]
+                banned_edges = {path[i] for path in found if len(path) > i and path[:i] == root}
+                spur = self._search(nodes[i], t, banned_edges, set(nodes[:i + 1]))
+                if spur is None:
+                    continue
+                candidate = tuple(root + spur)
+                if candidate not in seen:
+                    seen.add(candidate)
+                    counter += 1
+                    heapq.heappush(candidates, (len(candidate), counter, candidate))
+            if not candidates:
+                break
+            found.append(list(heapq.heappop(candidates)[2]))
+
+        paths = [self._describe(s, path) for path in found]
+        threshold = len(found[-1]) if len(found) == k else _INF
+        self._store(key, paths, threshold, {edge for path in found for edge in path})
+        return paths
+
+    def disjoint_paths(self, source: str, target: str, k: int) -> List[dict]:
+        """至多 k 条链路不相交路径，总跳数最小（逐次最短增广路）"""
+        s, t = self._index(source), self._index(target)
+        key = ('disjoint', s, t, k)
+        entry = self._multi.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry[0]
+        self.stats['misses'] += 1
+        self._ensure()
+        self._tree(s)
+        self._tree(t)
+
+        # flow[edge]: 0 未使用，1 沿 u->v，-1 沿 v->u
+        flow: Dict[int, int] = {}
+        last_cost = 0
+        count = 0
+        while count < k and s != t:
+            augment = self._augment(s, t, flow)
+            if augment is None:
+                break
+            last_cost, path = augment
+            for edge, direction in path:
+                current = flow.get(edge, 0)
+                if current == -direction:
+                    del flow[edge]
+                else:
+                    flow[edge] = direction
+            count += 1
+
+        found = self._decompose(s, t, flow, count)
+        found.sort(key=len)
+        paths = [self._describe(s, path) for path in found]
+        threshold = last_cost if count == k else _INF
+        self._store(key, paths, threshold, set(flow))
+        return paths
+
+    def _augment(self, source: int, target: int, flow: Dict[int, int]):
+        """残量图上的最短增广路（SPFA，反向流边代价为 -1）"""
+        offsets, targets, edge_of, alive, transit = self.offsets, self.targets, self.edge_of, self.alive, self.transit
+        cost = {source: 0}
+        parent: Dict[int, Tuple[int, int, int]] = {}
+        queue = deque([source])
+        queued = {source}
+        while queue:
+            u = queue.popleft()
+            queued.discard(u)
+            if u != source and not transit[u]:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                edge = edge_of[i]
+                if not alive[edge]:
+                    continue
+                v = targets[i]
+                direction = 1 if self.edges[edge][0] == u else -1
+                current = flow.get(edge, 0)
+                if current == direction:
+                    continue
+                candidate = cost[u] + (-1 if current == -direction else 1)
+                if candidate < cost.get(v, _INF):
+                    cost[v] = candidate
+                    parent[v] = (u, edge, direction)
+                    if v not in queued:
+                        queue.append(v)
+                        queued.add(v)
+        if target not in cost:
+            return None
+        path = []
+        node = target
+        while node != source:
+            u, edge, direction = parent[node]
+            path.append((edge, direction))
+            node = u
+        return cost[target], path
+
+    def _decompose(self, source: int, target: int, flow: Dict[int, int], count: int) -> List[List[int]]:
+        """把流分解成路径"""
+        outgoing: Dict[int, List[Tuple[int, int]]] = {}
+        for edge, direction in flow.items():
+            u, v = self.edges[edge][0], self.edges[edge][1]
+            if direction < 0:
+                u, v = v, u
+            outgoing.setdefault(u, []).append((edge, v))
+        paths = []
+        for _ in range(count):
+            path = []
+            node = source
+            while node != target:
+                edge, node = outgoing[node].pop()
+                path.append(edge)
+            paths.append(path)
+        return paths
+
+    def get_stats(self) -> dict:
+        return dict(
+            self.stats,
+            nodes=len(self._node_ids),
+            links=len(self._edge_ids),
+            trees=len(self._trees),
+            entries=len(self._multi)
+        )
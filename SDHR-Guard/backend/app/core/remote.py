@@ -0,0 +1,231 @@
+"""多进程部署下的 supervisor 命令通道与 worker 端代理
+
+supervisor 进程独占控制器子进程、Mininet 和采集循环；worker 进程中的
+Remote* 代理提供与本地管理器相同的接口：读操作来自共享内存快照，
+写操作（启动/停止控制器、主动采集等）通过本地 socket 转发给 supervisor。
+"""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Awaitable, Callable, Dict, Optional
+
+from config.settings import settings
+from app.core.snapshot import SnapshotReader
+from app.core.monitor import FlowMonitor
+from app.core.tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+class CommandServer:
+    """supervisor 端命令服务，把 worker 的请求调度到 supervisor 的事件循环上执行"""
+    def __init__(self, address: str, authkey: bytes,
+                 handlers: Dict[str, Callable[..., Awaitable]], timeout: float = 60):
+        if not authkey:
+            raise ValueError("未设置 SUPERVISOR_AUTHKEY 环境变量")
+        self.address = address
+        self.authkey = authkey
+        self.handlers = handlers
+        self.timeout = timeout
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.listener: Optional[Listener] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        if os.path.exists(self.address):
+            # 上次异常退出遗留的 socket 文件
+            os.unlink(self.address)
+        # 只允许当前用户连接：创建时即以 0600 权限绑定，避免 chmod 之前的窗口期
+        umask = os.umask(0o177)
+        try:
+            self.listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        os.chmod(self.address, 0o600)
+        threading.Thread(target=self._accept_loop, name='command-server', daemon=True).start()
+        logger.info(f"命令通道已监听: {self.address}")
+
+    def close(self):
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def _accept_loop(self):
+        while self.listener is not None:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                if self.listener is not None:
+                    logger.error(f"命令通道接受连接失败: {str(e)}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            try:
+                method, args = conn.recv()
+                handler = self.handlers.get(method)
+                if handler is None:
+                    raise ValueError(f"未知的命令: {method}")
+                future = asyncio.run_coroutine_threadsafe(handler(*args), self.loop)
+                try:
+                    result = future.result(self.timeout)
+                except concurrent.futures.TimeoutError:
+                    # 超时后不再让命令在 supervisor 中继续执行
+                    future.cancel()
+                    raise RuntimeError(f"命令 {method} 执行超时({self.timeout}s)")
+                conn.send(('ok', result))
+            except ValueError as e:
+                conn.send(('value_error', str(e)))
+            except Exception as e:
+                logger.error(f"执行命令失败: {str(e)}")
+                conn.send(('error', str(e)))
+
+class CommandClient:
+    """worker 端命令客户端"""
+    def __init__(self, address: str, authkey: bytes):
+        if not authkey:
+            raise ValueError("未设置 SUPERVISOR_AUTHKEY 环境变量")
+        self.address = address
+        self.authkey = authkey
+
+    def _call(self, method: str, args: tuple):
+        with Client(self.address, family='AF_UNIX', authkey=self.authkey) as conn:
+            conn.send((method, args))
+            return conn.recv()
+
+    async def call(self, method: str, *args):
+        loop = asyncio.get_running_loop()
+        status, result = await loop.run_in_executor(None, self._call, method, args)
+        if status == 'value_error':
+            raise ValueError(result)
+        if status != 'ok':
+            raise RuntimeError(result)
+        return result
+
+_reader: Optional[SnapshotReader] = None
+_client: Optional[CommandClient] = None
+
+def get_reader() -> SnapshotReader:
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader(settings.SNAPSHOT_PREFIX)
+    return _reader
+
+def get_client() -> CommandClient:
+    global _client
+    if _client is None:
+        _client = CommandClient(settings.SUPERVISOR_ADDRESS, settings.SUPERVISOR_AUTHKEY)
+    return _client
+
+class RemoteControllerManager:
+    """ControllerManager 的 worker 端代理"""
+    def __init__(self):
+        self.reader = get_reader()
+        self.client = get_client()
+
+    def get_all_status(self):
+        return self.reader.get('controllers')
+
+    async def start_controller(self, controller_id: str):
+        return await self.client.call('start_controller', controller_id)
+
+    async def stop_controller(self, controller_id: str):
+        return await self.client.call('stop_controller', controller_id)
+
+    async def health_check(self, controller_id: str):
+        # supervisor 的 _health_loop 定期探测并发布，读请求不再触发探测
+        controllers = self.reader.get('controllers')
+        if controller_id not in controllers:
+            raise ValueError(f"未知的控制器: {controller_id}")
+        controller = controllers[controller_id]
+        return {"status": controller['status'], "health": controller['health']}
+
+    async def switchover(self, from_id: str, to_id: str):
+        return await self.client.call('switchover', from_id, to_id)
+
+class RemoteTopologyManager:
+    """TopologyManager 的 worker 端代理"""
+    def __init__(self):
+        self.reader = get_reader()
+        self.client = get_client()
+
+    def get_current_topology(self):
+        return self.reader.get('topology')['topology']
+
+    def get_statistics(self):
+        return self.reader.get('topology')['stats']
+
+    async def find_paths(self, source: str, target: str, mode: str = 'shortest', k: int = 1):
+        # 路径索引只在 supervisor 中维护
+        return await self.client.call('find_paths', source, target, mode, k)
+
+    def get_changes(self, since: int):
+        snapshot = self.reader.get('topology')
+        version, deltas = snapshot['version'], snapshot['deltas']
+        if since < version and (not deltas or deltas[0]['version'] > since + 1):
+            return {"version": version, "reset": True, "topology": snapshot['topology']}
+        return {
+            "version": version,
+            "reset": False,
+            "deltas": [delta for delta in deltas if delta['version'] > since]
+        }
+
+class RemoteFlowMonitor(FlowMonitor):
+    """FlowMonitor 的 worker 端代理，查询逻辑复用 FlowMonitor，数据来自快照"""
+    def __init__(self):
+        super().__init__()
+        self.reader = get_reader()
+        self.client = get_client()
+
+    async def collect_stats(self, switch_id: str):
+        return await self.client.call('collect_stats', switch_id)
+
+    def get_flow_history(self, *args, **kwargs):
+        self.flow_stats = self.reader.get('flow_history')
+        return super().get_flow_history(*args, **kwargs)
+
+    def get_top_flows(self, *args, **kwargs):
+        self.flow_tables = self.reader.get('flow_tables')
+        return super().get_top_flows(*args, **kwargs)
+
+class RemoteTracer(Tracer):
+    """Tracer 的 worker 端代理，span 来自 supervisor 的快照"""
+    def __init__(self):
+        super().__init__()
+        self.reader = get_reader()
+
+    def export_json(self, limit=None):
+        self.spans = self.reader.get('traces')
+        return super().export_json(limit)
+
+    def export_chrome(self, limit=None):
+        self.spans = self.reader.get('traces')
+        return super().export_chrome(limit)
+
+    def summary(self):
+        self.spans = self.reader.get('traces')
+        return super().summary()
+
+class RemoteCollectionScheduler:
+    """CollectionScheduler 的 worker 端代理"""
+    def __init__(self):
+        self.reader = get_reader()
+
+    def get_status(self):
+        return self.reader.get('collector')
+
+class RemoteDashboardSummary:
+    """DashboardSummary 的 worker 端代理，直接返回 supervisor 编码好的 JSON"""
+    def __init__(self):
+        self.reader = get_reader()
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.reader.get_raw("dashboard")[0]}"'
+
+    @property
+    def encoded(self) -> bytes:
+        return self.reader.get_raw('dashboard')[1]
@@ -0,0 +1,179 @@
+"""共享内存状态快照
+
+supervisor 进程把各管理器的状态编码后写入共享内存段，
+多个 API worker 进程直接从共享内存读取，不再各自持有状态。
+每个快照段使用序列锁(seqlock)：写入期间序号为奇数，读端遇到奇数
+或读前读后序号不一致时重试。
+"""
+import logging
+import pickle
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('<QQ')  # 序号, 数据长度
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """连接已存在的共享内存段，并避免 resource_tracker 在本进程退出时将其删除"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 之前没有 track 参数
+        segment = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+class SnapshotSegment:
+    """单个快照段"""
+    def __init__(self, segment: shared_memory.SharedMemory):
+        self.segment = segment
+        self.capacity = segment.size - _HEADER.size
+        self.seq = 0
+
+    @classmethod
+    def create(cls, name: str, size: int) -> 'SnapshotSegment':
+        try:
+            segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 上次异常退出遗留的段，删除后重建
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(segment.buf, 0, 0, 0)
+        return cls(segment)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SnapshotSegment':
+        return cls(_attach(name))
+
+    def write(self, payload: bytes):
+        if len(payload) > self.capacity:
+            raise ValueError(f"快照大小 {len(payload)} 超过共享内存段容量 {self.capacity}")
+        buf = self.segment.buf
+        _HEADER.pack_into(buf, 0, self.seq + 1, 0)
+        buf[_HEADER.size:_HEADER.size + len(payload)] = payload
+        self.seq += 2
+        _HEADER.pack_into(buf, 0, self.seq, len(payload))
+
+    def read_seq(self) -> int:
+        return _HEADER.unpack_from(self.segment.buf, 0)[0]
+
+    def read(self, timeout: float = 1.0) -> Tuple[int, bytes]:
+        """读取一致的快照；写入进行中时退避等待，最长 timeout 秒"""
+        buf = self.segment.buf
+        deadline = time.monotonic() + timeout
+        delay = 0.0001
+        while True:
+            seq, length = _HEADER.unpack_from(buf, 0)
+            if not seq & 1:
+                payload = bytes(buf[_HEADER.size:_HEADER.size + length])
+                if _HEADER.unpack_from(buf, 0)[0] == seq:
+                    return seq, payload
+            if time.monotonic() >= deadline:
+                raise RuntimeError("读取快照超时：写入过于频繁")
+            # 数十 MB 的快照写入需要数十毫秒
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+    def close(self, unlink: bool = False):
+        self.segment.close()
+        if unlink:
+            self.segment.unlink()
+
+class SnapshotPublisher:
+    """快照发布端（supervisor 进程）"""
+    def __init__(self, prefix: str, segment_size: int):
+        self.prefix = prefix
+        self.segment_size = segment_size
+        self.segments: Dict[str, SnapshotSegment] = {}
+
+    def publish_raw(self, name: str, payload: bytes):
+        """发布已编码的快照"""
+        segment = self.segments.get(name)
+        if segment is None:
+            segment = SnapshotSegment.create(f"{self.prefix}_{name}", self.segment_size)
+            self.segments[name] = segment
+        try:
+            segment.write(payload)
+        except ValueError as e:
+            logger.error(f"发布快照 {name} 失败: {str(e)}")
+
+    def publish(self, name: str, value: Any):
+        """发布任意可序列化对象"""
+        self.publish_raw(name, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close(unlink=True)
+        self.segments.clear()
+
+class SnapshotReader:
+    """快照读取端（API worker 进程），按序号缓存解码结果
+
+    已有缓存时遇到进行中的写入不等待，直接返回上一版本。
+    """
+    def __init__(self, prefix: str, timeout: float = 1.0):
+        self.prefix = prefix
+        self.timeout = timeout
+        self.segments: Dict[str, SnapshotSegment] = {}
+        self._cache: Dict[str, Tuple[int, Any]] = {}
+        self._raw_cache: Dict[str, Tuple[int, bytes]] = {}
+
+    def _segment(self, name: str) -> SnapshotSegment:
+        segment = self.segments.get(name)
+        if segment is None:
+            try:
+                segment = SnapshotSegment.attach(f"{self.prefix}_{name}")
+            except FileNotFoundError:
+                raise RuntimeError(f"快照 {name} 尚未发布，请确认 supervisor 进程已启动")
+            self.segments[name] = segment
+        return segment
+
+    def get_raw(self, name: str) -> Tuple[int, bytes]:
+        """读取原始快照，返回 (序号, 数据)"""
+        segment = self._segment(name)
+        cached = self._raw_cache.get(name)
+        if cached is not None and cached[0] == segment.read_seq():
+            return cached
+        result = self._read(segment, cached is not None)
+        if result is None:
+            return cached
+        self._raw_cache[name] = result
+        return result
+
+    def get(self, name: str) -> Any:
+        """读取并解码快照；序号未变化时直接返回缓存的对象"""
+        segment = self._segment(name)
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == segment.read_seq():
+            return cached[1]
+        result = self._read(segment, cached is not None)
+        if result is None:
+            return cached[1]
+        seq, payload = result
+        if seq == 0:
+            raise RuntimeError(f"快照 {name} 尚未发布")
+        value = pickle.loads(payload)
+        self._cache[name] = (seq, value)
+        return value
+
+    def _read(self, segment: SnapshotSegment, has_cache: bool) -> Optional[Tuple[int, bytes]]:
+        """读取快照；有缓存且写入进行中时返回 None，由调用方沿用缓存"""
+        try:
+            return segment.read(0 if has_cache else self.timeout)
+        except RuntimeError:
+            if not has_cache:
+                raise
+            return None
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close()
+        self.segments.clear()
+        self._cache.clear()
+        self._raw_cache.clear()
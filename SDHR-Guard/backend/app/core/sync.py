@@ -0,0 +1,361 @@
+"""主控制器流表状态向备用控制器的增量同步
+
+FlowMonitor 每次采集时给出各交换机流表的新增/删除项（即主控制器下发的
+流表变化），这里把它们记录为带版本号的变更日志。每个备用控制器维护
+已同步到的版本，按 sync_interval 只回放之后的变更，并分批下发；
+落后超过日志长度的备用控制器做一次全量同步。
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import urllib.error
+import urllib.request
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from config.dhr_config import DHR_CONFIG
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# ovs-ofctl 中协议简写对应的匹配字段
+_PROTOCOLS = {
+    'ip': {'dl_type': '0x0800'},
+    'ipv6': {'dl_type': '0x86dd'},
+    'arp': {'dl_type': '0x0806'},
+    'icmp': {'dl_type': '0x0800', 'nw_proto': '1'},
+    'tcp': {'dl_type': '0x0800', 'nw_proto': '6'},
+    'udp': {'dl_type': '0x0800', 'nw_proto': '17'}
+}
+
+# 本引擎写入 ODL 的流表项 id 前缀
+FLOW_ID_PREFIX = 'sdhr-'
+
+def parse_flow_spec(flow: str) -> Tuple[Dict[str, str], List[str]]:
+    """把 dump-flows 的流表项标识拆成 (匹配字段, 动作列表)
+
+    不带值的标记（如 send_flow_rem）以空字符串作为值保留，便于调用方识别。
+    """
+    match_part, _, action_part = flow.partition(' actions=')
+    fields: Dict[str, str] = {}
+    for token in match_part.replace(' ', '').split(','):
+        if not token:
+            continue
+        if '=' in token:
+            key, value = token.split('=', 1)
+            fields[key] = value
+        elif token in _PROTOCOLS:
+            fields.update(_PROTOCOLS[token])
+        else:
+            fields[token] = ''
+    actions = [action for action in action_part.split(',') if action]
+    return fields, actions
+
+class UnsupportedFlow(ValueError):
+    """流表项含有无法等价转换的匹配字段或动作"""
+
+# 流表项属性而非匹配字段
+_FLOW_ATTRIBUTES = {'cookie', 'table', 'priority', 'idle_timeout', 'hard_timeout', 'send_flow_rem', 'reset_counts'}
+# ovs-ofctl 保留端口名 -> ODL output-node-connector
+_RESERVED_PORTS = {
+    'CONTROLLER': 'CONTROLLER',
+    'IN_PORT': 'INPORT',
+    'NORMAL': 'NORMAL',
+    'FLOOD': 'FLOOD',
+    'ALL': 'ALL',
+    'LOCAL': 'LOCAL'
+}
+
+class OdlRestconfApplier:
+    """通过 RESTCONF 把流表写入备用 ODL 的配置数据库
+
+    ODL 在交换机连接时会按配置数据库下发流表，因此切换后无需重新学习。
+    只管理 flow id 以 sdhr- 开头的流表项，不触碰其他来源写入的配置。
+    无法等价转换的流表项跳过并计数，不会以更宽的匹配或错误的动作下发。
+    """
+    def __init__(self, base_url: str = None, user: str = None, password: str = None, timeout: float = 5):
+        self.base_url = (base_url or settings.ODL_RESTCONF_URL).rstrip('/')
+        credentials = f"{user or settings.ODL_USER}:{password or settings.ODL_PASSWORD}"
+        self.auth = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+        self.timeout = timeout
+        self.skipped = 0
+
+    def _node_url(self, dpid: str) -> str:
+        return f"{self.base_url}/config/opendaylight-inventory:nodes/node/openflow:{int(dpid, 16)}"
+
+    def _flow_url(self, dpid: str, table_id: int, flow_id: str) -> str:
+        return f"{self._node_url(dpid)}/flow-node-inventory:table/{table_id}/flow/{flow_id}"
+
+    def _request(self, method: str, url: str, body: Optional[dict] = None) -> Optional[dict]:
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(url, data=data, method=method)
+        request.add_header('Authorization', self.auth)
+        request.add_header('Content-Type', 'application/json')
+        request.add_header('Accept', 'application/json')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                if method == 'GET':
+                    return json.loads(response.read() or b'{}')
+        except urllib.error.HTTPError as e:
+            # 读取/删除不存在的流表项或节点不算错误
+            if not (method in ('GET', 'DELETE') and e.code == 404):
+                raise
+        return None
+
+    @staticmethod
+    def flow_id(flow: str) -> str:
+        return FLOW_ID_PREFIX + hashlib.sha1(flow.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def to_odl_flow(flow: str) -> dict:
+        """把 ovs-ofctl 格式的流表项转换为 ODL 的 flow 结构，无法等价转换时抛出 UnsupportedFlow"""
+        fields, actions = parse_flow_spec(flow)
+        match: Dict[str, object] = {}
+        ethernet: Dict[str, object] = {}
+        ip_match: Dict[str, object] = {}
+        for key, value in fields.items():
+            if key in _FLOW_ATTRIBUTES:
+                continue
+            if key == 'in_port':
+                match['in-port'] = value
+            elif key == 'dl_src':
+                ethernet['ethernet-source'] = {'address': value}
+            elif key == 'dl_dst':
+                ethernet['ethernet-destination'] = {'address': value}
+            elif key == 'dl_type':
+                ethernet['ethernet-type'] = {'type': int(value, 0)}
+            elif key == 'dl_vlan':
+                match['vlan-match'] = {'vlan-id': {'vlan-id': int(value, 0), 'vlan-id-present': True}}
+            elif key in ('nw_src', 'nw_dst'):
+                address = value if '/' in value else value + '/32'
+                match['ipv4-source' if key == 'nw_src' else 'ipv4-destination'] = address
+            elif key == 'nw_proto':
+                ip_match['ip-protocol'] = int(value, 0)
+            elif key == 'nw_tos':
+                ip_match['ip-dscp'] = int(value, 0) >> 2
+            elif key in ('tp_src', 'tp_dst'):
+                protocol = {'6': 'tcp', '17': 'udp'}.get(fields.get('nw_proto'))
+                if protocol is None or '/' in value:
+                    raise UnsupportedFlow(f"无法转换的匹配字段: {key}={value}")
+                direction = 'source' if key == 'tp_src' else 'destination'
+                match[f'{protocol}-{direction}-port'] = int(value, 0)
+            else:
+                raise UnsupportedFlow(f"无法转换的匹配字段: {key}" + (f"={value}" if value else ''))
+        if ethernet:
+            match['ethernet-match'] = ethernet
+        if ip_match:
+            match['ip-match'] = ip_match
+
+        odl_actions = []
+        for action in actions:
+            if action == 'drop':
+                odl_actions.append({'drop-action': {}})
+                continue
+            name, _, argument = action.partition(':')
+            if name == 'output' and argument.isdigit():
+                target = argument
+            elif action.isdigit():
+                target = action
+            elif name in _RESERVED_PORTS:
+                target = _RESERVED_PORTS[name]
+            else:
+                raise UnsupportedFlow(f"无法转换的动作: {action}")
+            odl_actions.append({'output-action': {'output-node-connector': target}})
+        for order, action in enumerate(odl_actions):
+            action['order'] = order
+
+        result = {
+            'id': OdlRestconfApplier.flow_id(flow),
+            'table_id': int(fields.get('table', 0)),
+            'priority': int(fields.get('priority', 32768)),
+            'cookie': int(fields.get('cookie', '0'), 0),
+            'match': match,
+            'instructions': {
+                'instruction': [{'order': 0, 'apply-actions': {'action': odl_actions}}]
+            }
+        }
+        for key in ('idle_timeout', 'hard_timeout'):
+            if key in fields:
+                result[key.replace('_', '-')] = int(fields[key])
+        return result
+
+    def _clear(self, dpid: str):
+        """删除节点上由本引擎写入的流表项"""
+        config = self._request('GET', self._node_url(dpid)) or {}
+        for node in config.get('node', config.get('opendaylight-inventory:node', [])):
+            for table in node.get('flow-node-inventory:table', []):
+                for flow in table.get('flow', []):
+                    if str(flow.get('id', '')).startswith(FLOW_ID_PREFIX):
+                        self._request('DELETE', self._flow_url(dpid, table['id'], flow['id']))
+
+    def _apply_one(self, op: str, dpid: str, body: Optional[dict]):
+        if op == 'clear':
+            self._clear(dpid)
+            return
+        url = self._flow_url(dpid, body['table_id'], body['id'])
+        if op == 'add':
+            self._request('PUT', url, {'flow-node-inventory:flow': [body]})
+        else:
+            self._request('DELETE', url)
+
+    def _convert(self, ops: List[Tuple[str, str, Optional[str]]]) -> List[Tuple[str, str, Optional[dict]]]:
+        converted = []
+        for op, dpid, flow in ops:
+            if op == 'clear':
+                converted.append((op, dpid, None))
+                continue
+            try:
+                converted.append((op, dpid, self.to_odl_flow(flow)))
+            except UnsupportedFlow as e:
+                # 删除操作对应的流表项从未被写入，同样跳过
+                self.skipped += 1
+                logger.warning(f"跳过无法同步的流表项 [{flow}]: {str(e)}")
+        return converted
+
+    async def apply(self, ops: List[Tuple[str, str, Optional[str]]]):
+        """并发下发一批变更，ops 为 (操作, dpid, 流表项)"""
+        loop = asyncio.get_running_loop()
+        ops = self._convert(ops)
+        # clear 必须先于同一批中的 add 执行
+        for op, dpid, body in ops:
+            if op == 'clear':
+                await loop.run_in_executor(None, self._apply_one, op, dpid, body)
+        await asyncio.gather(*(
+            loop.run_in_executor(None, self._apply_one, op, dpid, body)
+            for op, dpid, body in ops if op != 'clear'
+        ))
+
+class FlowSyncEngine:
+    """流表状态增量同步引擎"""
+    def __init__(self, controller_manager, interval: float = None,
+                 batch_size: int = None, log_size: int = None):
+        self.controller_manager = controller_manager
+        self.interval = interval or DHR_CONFIG['sync_interval']
+        self.batch_size = batch_size or DHR_CONFIG['sync_batch_size']
+        self.log_size = log_size or DHR_CONFIG['sync_log_size']
+
+        self.version = 0
+        self.state: Dict[str, Set[str]] = {}   # 交换机 -> 当前流表项
+        self.dpids: Dict[str, str] = {}
+        self._log: List[Tuple[str, str, str]] = []  # (操作, 交换机, 流表项)
+        self._versions: List[int] = []
+        self.cursors: Dict[str, int] = {}      # 备用控制器 -> 已同步到的版本
+        # 各控制器的下发方式；没有北向流表接口的控制器不参与同步
+        self.appliers = {'odl': OdlRestconfApplier()}
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def on_event(self, event: dict):
+        """接收 FlowMonitor 和 ControllerManager 的事件"""
+        if event.get('type') == 'flow_delta':
+            self._record(event['switch_id'], event['dpid'], event['added'], event['removed'])
+        elif event.get('type') == 'switchover':
+            # 作为主控制器期间没有向其数据存储写入，再次成为备用时需要全量同步
+            self.cursors.pop(event['from'], None)
+            self.cursors.pop(event['to'], None)
+
+    def _record(self, switch_id: str, dpid: str, added: List[str], removed: List[str]):
+        self.dpids[switch_id] = dpid
+        flows = self.state.setdefault(switch_id, set())
+        for op, changes in (('add', added), ('remove', removed)):
+            for flow in changes:
+                self.version += 1
+                self._versions.append(self.version)
+                self._log.append((op, switch_id, flow))
+                if op == 'add':
+                    flows.add(flow)
+                else:
+                    flows.discard(flow)
+
+        excess = len(self._log) - self.log_size
+        if excess > 0:
+            del self._log[:excess]
+            del self._versions[:excess]
+
+    def _pending(self, cursor: Optional[int]) -> List[Tuple[str, str, Optional[str]]]:
+        """计算从 cursor 到当前版本需要下发的变更"""
+        if cursor is not None and cursor >= self.version:
+            return []
+        if cursor is None or not self._versions or cursor < self._versions[0] - 1:
+            # 从未同步过或已落后于日志：全量同步
+            ops = [('clear', switch_id, None) for switch_id in self.state]
+            ops.extend(('add', switch_id, flow) for switch_id, flows in self.state.items() for flow in flows)
+            return ops
+
+        # 合并同一流表项的多次变更，只保留净效果
+        net: Dict[Tuple[str, str], List[str]] = {}
+        for op, switch_id, flow in self._log[bisect_right(self._versions, cursor):]:
+            key = (switch_id, flow)
+            if key in net:
+                net[key][1] = op
+            else:
+                net[key] = [op, op]
+        return [
+            (last, switch_id, flow)
+            for (switch_id, flow), (first, last) in net.items()
+            if not (first == 'add' and last == 'remove')
+        ]
+
+    async def sync_controller(self, controller_id: str) -> int:
+        """把变更同步到指定控制器，返回下发的变更数"""
+        applier = self.appliers.get(controller_id)
+        if applier is None:
+            return 0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            target = self.version
+            ops = self._pending(self.cursors.get(controller_id))
+            with tracer.span('sync.replay', controller=controller_id, ops=len(ops)):
+                for i in range(0, len(ops), self.batch_size):
+                    batch = ops[i:i + self.batch_size]
+                    await applier.apply([(op, self.dpids[switch_id], flow) for op, switch_id, flow in batch])
+            self.cursors[controller_id] = target
+        if ops:
+            logger.info(f"已向控制器 {controller_id} 同步 {len(ops)} 条流表变更 (版本 {target})")
+        return len(ops)
+
+    async def sync_once(self):
+        """向所有运行中的备用控制器同步一次"""
+        active = self.controller_manager.get_active()
+        for controller_id, controller in self.controller_manager.controllers.items():
+            if controller_id == active or controller['status'] != 'running':
+                continue
+            try:
+                await self.sync_controller(controller_id)
+            except Exception as e:
+                logger.error(f"同步流表到控制器 {controller_id} 失败: {str(e)}")
+
+    def get_status(self):
+        """获取同步状态"""
+        return {
+            'version': self.version,
+            'log_size': len(self._log),
+            'flows': sum(len(flows) for flows in self.state.values()),
+            'skipped': {controller_id: applier.skipped for controller_id, applier in self.appliers.items()},
+            'cursors': {
+                controller_id: {'version': cursor, 'lag': self.version - cursor}
+                for controller_id, cursor in self.cursors.items()
+            }
+        }
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.sync_once()
@@ -1,137 +1,216 @@
-from mininet.net import Mininet
-from mininet.node import RemoteController
-from mininet.topo import Topo
-from mininet.cli import CLI
-import logging
-
-logger = logging.getLogger(__name__)
-
-class CustomTopo(Topo):
-    """自定义拓扑类"""
-    def build(self):
-        # 创建交换机
-        s1 = self.addSwitch('s1')
-        s2 = self.addSwitch('s2')
-        s3 = self.addSwitch('s3')
-
-        # 创建主机
-        h1 = self.addHost('h1')
-        h2 = self.addHost('h2')
-        h3 = self.addHost('h3')
-        h4 = self.addHost('h4')
-
-        # 添加链路
-        self.addLink(h1, s1)
-        self.addLink(h2, s1)
-        self.addLink(h3, s2)
-        self.addLink(h4, s3)
-        self.addLink(s1, s2)
-        self.addLink(s2, s3)
-
-class TopologyManager:
-    """拓扑管理器"""
-    def __init__(self):
-        self.net = None
-        self.topo = CustomTopo()
-        
-    async def initialize(self):
-        """初始化网络"""
-        try:
-            self.net = Mininet(
-                topo=self.topo,
-                controller=RemoteController('c0', ip='127.0.0.1', port=6653)
-            )
-            self.net.start()
-            logger.info("Mininet网络已启动")
-        except Exception as e:
-            logger.error(f"初始化网络失败: {str(e)}")
-            raise
-
-    def get_current_topology(self):
-        """获取当前网络拓扑"""
-        if not self.net:
-            return {"nodes": [], "links": []}
-            
-        nodes = []
-        links = []
-        
-        # 收集节点信息
-        for host in self.net.hosts:
-            nodes.append({
-                "id": host.name,
-                "type": "host",
-                "ip": host.IP()
-            })
-            
-        for switch in self.net.switches:
-            nodes.append({
-                "id": switch.name,
-                "type": "switch",
-                "dpid": switch.dpid
-            })
-            
-        # 收集链路信息
-        for link in self.net.links:
-            links.append({
-                "source": link.intf1.node.name,
-                "target": link.intf2.node.name
-            })
-            
-        return {
-            "nodes": nodes,
-            "links": links
-        }
-
-    def get_statistics(self):
-        """获取网络统计信息"""
-        if not self.net:
-            return {}
-            
-        stats = {
-            "host_count": len(self.net.hosts),
-            "switch_count": len(self.net.switches),
-            "link_count": len(self.net.links),
-            "hosts": {},
-            "switches": {}
-        }
-        
-        # 收集主机统计信息
-        for host in self.net.hosts:
-            stats["hosts"][host.name] = {
-                "ip": host.IP(),
-                "mac": host.MAC()
-            }
-            
-        # 收集交换机统计信息
-        for switch in self.net.switches:
-            stats["switches"][switch.name] = {
-                "dpid": switch.dpid,
-                "ports": len(switch.intfs)
-            }
-            
-        return stats
-
-    async def cleanup(self):
-        """清理网络资源"""
-        if self.net:
-            self.net.stop()
-            logger.info("Mininet网络已停止")
-
-if __name__ == '__main__':
-    # 创建拓扑
-    topo = CustomTopo()
-    
-    # 创建网络
-    net = Mininet(
-        topo=topo,
-        controller=RemoteController('c0', ip='127.0.0.1', port=6653)
-    )
-    
-    # 启动网络
-    net.start()
-    
-    # 进入CLI
-    CLI(net)
-    
-    # 停止网络
+from mininet.net import Mininet
+from mininet.node import RemoteController
+from mininet.topo import Topo
+from mininet.cli import CLI
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.tracing import tracer
+from app.core.topology_events import EventSource, OvsdbEventSource, TopologyGraph
+from app.core.paths import PathIndex
+
+logger = logging.getLogger(__name__)
+
+class CustomTopo(Topo):
+    """自定义拓扑类"""
+    def build(self):
+        # 创建交换机
+        s1 = self.addSwitch('s1')
+        s2 = self.addSwitch('s2')
+        s3 = self.addSwitch('s3')
+
+        # 创建主机
+        h1 = self.addHost('h1')
+        h2 = self.addHost('h2')
+        h3 = self.addHost('h3')
+        h4 = self.addHost('h4')
+
+        # 添加链路
+        self.addLink(h1, s1)
+        self.addLink(h2, s1)
+        self.addLink(h3, s2)
+        self.addLink(h4, s3)
+        self.addLink(s1, s2)
+        self.addLink(s2, s3)
+
+class TopologyManager:
+    """拓扑管理器"""
+    def __init__(self):
+        self.net = None
+        self.topo = CustomTopo()
+        self._listeners: List[Callable[[dict], None]] = []
+        # 初始化时构建一次，之后由事件源增量更新
+        self.graph = TopologyGraph()
+        self.graph.subscribe(lambda delta: self._notify())
+        # 路径索引随拓扑增量选择性失效
+        self.paths = PathIndex(self.graph)
+        self.event_source: Optional[EventSource] = None
+        self._feed_task: Optional[asyncio.Task] = None
+        self._stats = None
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """注册拓扑变化的回调"""
+        self._listeners.append(callback)
+
+    def make_event(self) -> dict:
+        """生成拓扑计数事件"""
+        event = {'type': 'topology', 'version': self.graph.version}
+        event.update(self.graph.counts())
+        return event
+
+    def _notify(self):
+        event = self.make_event()
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"拓扑变化通知失败: {str(e)}")
+        
+    async def initialize(self):
+        """初始化网络"""
+        try:
+            self.net = Mininet(
+                topo=self.topo,
+                controller=RemoteController('c0', ip='127.0.0.1', port=6653)
+            )
+            self.net.start()
+            logger.info("Mininet网络已启动")
+            self.graph.load(self.net)
+        except Exception as e:
+            logger.error(f"初始化网络失败: {str(e)}")
+            raise
+
+    async def start_event_feed(self, source: Optional[EventSource] = None):
+        """启动拓扑事件订阅，默认监听 OVSDB"""
+        if self._feed_task is not None:
+            return
+        self.event_source = source or OvsdbEventSource(graph=self.graph)
+        self._feed_task = asyncio.create_task(self._consume_events())
+        logger.info(f"拓扑事件源已启动: {type(self.event_source).__name__}")
+
+    async def stop_event_feed(self):
+        """停止拓扑事件订阅"""
+        if self._feed_task is not None:
+            self._feed_task.cancel()
+            try:
+                await self._feed_task
+            except asyncio.CancelledError:
+                pass
+            self._feed_task = None
+        if self.event_source is not None:
+            await self.event_source.close()
+            self.event_source = None
+
+    async def _consume_events(self):
+        async for event in self.event_source.events():
+            try:
+                self.graph.apply(event)
+            except Exception as e:
+                logger.error(f"处理拓扑事件失败: {str(e)}")
+
+    async def reconnect_switches(self, port: int, timeout: float = 10) -> Tuple[int, int]:
+        """让所有交换机连接到指定端口的控制器，返回 (超时前完成重连的交换机数, 交换机总数)"""
+        if not self.net:
+            return 0, 0
+
+        with tracer.span('reconnect.set_controller', port=port):
+            for switch in self.net.switches:
+                switch.cmd(f"ovs-vsctl set-controller {switch.name} tcp:127.0.0.1:{port}")
+
+        with tracer.span('reconnect.wait_connected', port=port) as span:
+            pending = list(self.net.switches)
+            deadline = asyncio.get_running_loop().time() + timeout
+            while pending and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.05)
+                pending = [switch for switch in pending if not switch.connected()]
+            span['attrs']['pending'] = [switch.name for switch in pending]
+
+        if pending:
+            logger.warning(f"{len(pending)} 台交换机未能在 {timeout}s 内重连")
+        return len(self.net.switches) - len(pending), len(self.net.switches)
+
+    def get_current_topology(self):
+        """获取当前网络拓扑"""
+        return self.graph.snapshot()
+
+    def get_changes(self, since: int):
+        """获取某版本之后的拓扑增量；版本过旧时返回完整拓扑"""
+        deltas = self.graph.deltas_since(since)
+        if deltas is None:
+            return {"version": self.graph.version, "reset": True, "topology": self.graph.snapshot()}
+        return {"version": self.graph.version, "reset": False, "deltas": deltas}
+
+    async def find_paths(self, source: str, target: str, mode: str = 'shortest', k: int = 1):
+        """查询两节点间的路径，mode 为 shortest / k_shortest / disjoint"""
+        if mode == 'shortest':
+            path = self.paths.shortest_path(source, target)
+            paths = [path] if path else []
+        elif mode == 'k_shortest':
+            paths = self.paths.k_shortest_paths(source, target, k)
+        elif mode == 'disjoint':
+            paths = self.paths.disjoint_paths(source, target, k)
+        else:
+            raise ValueError(f"不支持的路径类型: {mode}")
+        return {
+            "source": source,
+            "target": target,
+            "mode": mode,
+            "version": self.graph.version,
+            "paths": paths
+        }
+
+    def get_statistics(self):
+        """获取网络统计信息（按拓扑版本缓存）"""
+        if not self.graph.nodes:
+            return {}
+        if self._stats is not None and self._stats[0] == self.graph.version:
+            return self._stats[1]
+
+        stats = dict(self.graph.counts(), hosts={}, switches={})
+        port_counts: Dict[str, int] = {}
+        for port in self.graph.ports.values():
+            port_counts[port['node']] = port_counts.get(port['node'], 0) + 1
+
+        # 收集主机统计信息
+        for node in self.graph.nodes.values():
+            if node['type'] == 'host':
+                stats["hosts"][node['id']] = {
+                    "ip": node['ip'],
+                    "mac": node['mac']
+                }
+            else:
+                stats["switches"][node['id']] = {
+                    "dpid": node['dpid'],
+                    "ports": port_counts.get(node['id'], 0)
+                }
+
+        self._stats = (self.graph.version, stats)
+        return stats
+
+    async def cleanup(self):
+        """清理网络资源"""
+        await self.stop_event_feed()
+        if self.net:
+            self.net.stop()
+            self.net = None
+            logger.info("Mininet网络已停止")
+            self.graph.load(None)
+
+if __name__ == '__main__':
+    # 创建拓扑
+    topo = CustomTopo()
+    
+    # 创建网络
+    net = Mininet(
+        topo=topo,
+        controller=RemoteController('c0', ip='127.0.0.1', port=6653)
+    )
+    
+    # 启动网络
+    net.start()
+    
+    # 进入CLI
+    CLI(net)
+    
+    # 停止网络
     net.stop() 
\ No newline at end of file
@@ -0,0 +1,488 @@
+"""事件驱动的拓扑变化检测
+
+拓扑只在初始化时完整遍历一次，之后由事件源（OVSDB monitor 或其他
+可插拔来源）推送交换机/端口/链路的增删和up/down事件，增量更新内存中的
+拓扑图，并向订阅者发布带版本号的变化。
+
+事件为字典，type 取值：
+    switch_add / switch_remove       {'name', 'dpid'}
+    host_add / host_remove           {'name', 'ip', 'mac'}
+    port_add / port_remove           {'name', 'node', 'port_no'}
+    port_up / port_down              {'name'}
+    link_add / link_remove           {'source_port', 'target_port'}
+    link_up / link_down              {'source_port', 'target_port'}
+"""
+import abc
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class TopologyGraph:
+    """内存中的拓扑图"""
+    def __init__(self, max_deltas: int = 1000):
+        self.nodes: Dict[str, dict] = {}
+        self.ports: Dict[str, dict] = {}
+        self.links: Dict[str, dict] = {}
+        self._port_links: Dict[str, set] = {}  # 端口 -> 链路ID
+        # 端点节点尚未出现的链路 -> (源端口, 目的端口)；Bridge 和 Interface 分别监听，
+        # 端口和链路可能先于所在交换机到达
+        self._pending_links: Dict[str, tuple] = {}
+        self.version = 0
+        self.deltas = deque(maxlen=max_deltas)
+        self._listeners: List[Callable[[dict], None]] = []
+        self._snapshot = None
+
+    @staticmethod
+    def link_id(source_port: str, target_port: str) -> str:
+        return '|'.join(sorted((source_port, target_port)))
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """订阅拓扑变化"""
+        self._listeners.append(callback)
+
+    def load(self, net):
+        """从 Mininet 网络一次性构建拓扑图；net 为 None 时清空"""
+        self.nodes.clear()
+        self.ports.clear()
+        self.links.clear()
+        self._port_links.clear()
+        self._pending_links.clear()
+        if net is None:
+            self._publish({'type': 'reload'}, {'reload': True})
+            return
+        for host in net.hosts:
+            self.nodes[host.name] = {'id': host.name, 'type': 'host', 'ip': host.IP(), 'mac': host.MAC(), 'status': 'up'}
+        for switch in net.switches:
+            self.nodes[switch.name] = {'id': switch.name, 'type': 'switch', 'dpid': switch.dpid, 'status': 'up'}
+        for node in net.hosts + net.switches:
+            for port_no, intf in node.intfs.items():
+                if intf.name == 'lo':
+                    continue
+                self.ports[intf.name] = {'name': intf.name, 'node': node.name, 'port_no': port_no, 'status': 'up'}
+        for link in net.links:
+            self._add_link(link.intf1.name, link.intf2.name)
+        self._publish({'type': 'reload'}, {'reload': True})
+
+    def apply(self, event: dict) -> Optional[dict]:
+        """应用一个事件，拓扑有变化时返回增量并发布"""
+        handler = getattr(self, f"_on_{event.get('type')}", None)
+        if handler is None:
+            logger.warning(f"未知的拓扑事件: {event.get('type')}")
+            return None
+        changes = handler(event)
+        if not changes:
+            return None
+        return self._publish(event, changes)
+
+    def deltas_since(self, version: int) -> Optional[List[dict]]:
+        """获取某版本之后的增量；版本过旧（已不在缓冲区中）时返回 None"""
+        if version >= self.version:
+            return []
+        if not self.deltas or self.deltas[0]['version'] > version + 1:
+            return None
+        return [delta for delta in self.deltas if delta['version'] > version]
+
+    def snapshot(self) -> dict:
+        """当前拓扑（按版本缓存）"""
+        if self._snapshot is None or self._snapshot['version'] != self.version:
+            self._snapshot = {
+                'version': self.version,
+                'nodes': list(self.nodes.values()),
+                'links': [
+                    {'source': link['source'], 'target': link['target'], 'status': link['status']}
+                    for link in self.links.values()
+                ]
+            }
+        return self._snapshot
+
+    def has_links(self, port: str) -> bool:
+        """端口是否已有链路"""
+        return bool(self._port_links.get(port))
+
+    def counts(self) -> dict:
+        hosts = sum(1 for node in self.nodes.values() if node['type'] == 'host')
+        return {
+            'host_count': hosts,
+            'switch_count': len(self.nodes) - hosts,
+            'link_count': len(self.links)
+        }
+
+    def _publish(self, event: dict, changes: dict) -> dict:
+        self.version += 1
+        delta = {'version': self.version, 'event': event, 'changes': changes}
+        self.deltas.append(delta)
+        for callback in self._listeners:
+            try:
+                callback(delta)
+            except Exception as e:
+                logger.error(f"拓扑变化通知失败: {str(e)}")
+        return delta
+
+    def _add_link(self, source_port: str, target_port: str) -> Optional[dict]:
+        link_id = self.link_id(source_port, target_port)
+        if link_id in self.links:
+            return None
+        source, target = self.ports.get(source_port), self.ports.get(target_port)
+        if source is None or target is None:
+            logger.warning(f"链路 {link_id} 的端口未知")
+            return None
+        if source['node'] not in self.nodes or target['node'] not in self.nodes:
+            # 节点加入时再补上
+            self._pending_links[link_id] = (source_port, target_port)
+            return None
+        link = {
+            'id': link_id,
+            'source': source['node'],
+            'target': target['node'],
+            'source_port': source_port,
+            'target_port': target_port,
+            'status': 'up' if source['status'] == target['status'] == 'up' else 'down'
+        }
+        self.links[link_id] = link
+        self._port_links.setdefault(source_port, set()).add(link_id)
+        self._port_links.setdefault(target_port, set()).add(link_id)
+        return link
+
+    def _remove_link(self, link_id: str) -> bool:
+        link = self.links.pop(link_id, None)
+        if link is None:
+            return False
+        for port in (link['source_port'], link['target_port']):
+            self._port_links.get(port, set()).discard(link_id)
+        return True
+
+    def _links_of_port(self, port: str) -> List[dict]:
+        return [self.links[link_id] for link_id in self._port_links.get(port, ())]
+
+    def _complete_links(self) -> List[dict]:
+        """添加两端节点均已存在的待定链路"""
+        links = []
+        for link_id, (source_port, target_port) in list(self._pending_links.items()):
+            if all(self.ports[port]['node'] in self.nodes for port in (source_port, target_port)):
+                del self._pending_links[link_id]
+                link = self._add_link(source_port, target_port)
+                if link:
+                    links.append(link)
+        return links
+
+    def _drop_pending(self, ports: List[str]):
+        removed = set(ports)
+        for link_id, link_ports in list(self._pending_links.items()):
+            if removed.intersection(link_ports):
+                del self._pending_links[link_id]
+
+    def _on_switch_add(self, event: dict):
+        if event['name'] in self.nodes:
+            return None
+        node = self.nodes[event['name']] = {'id': event['name'], 'type': 'switch', 'dpid': event.get('dpid'), 'status': 'up'}
+        return {'nodes': [node], 'links': self._complete_links()}
+
+    def _on_host_add(self, event: dict):
+        if event['name'] in self.nodes:
+            return None
+        node = self.nodes[event['name']] = {
+            'id': event['name'], 'type': 'host', 'ip': event.get('ip'), 'mac': event.get('mac'), 'status': 'up'
+        }
+        return {'nodes': [node], 'links': self._complete_links()}
+
+    def _on_switch_remove(self, event: dict):
+        name = event['name']
+        if name not in self.nodes:
+            return None
+        del self.nodes[name]
+        ports = [port for port, info in self.ports.items() if info['node'] == name]
+        links = [link['id'] for port in ports for link in self._links_of_port(port)]
+        for link_id in links:
+            self._remove_link(link_id)
+        for port in ports:
+            del self.ports[port]
+            self._port_links.pop(port, None)
+        self._drop_pending(ports)
+        return {'removed_nodes': [name], 'removed_ports': ports, 'removed_links': links}
+
+    _on_host_remove = _on_switch_remove
+
+    def _on_port_add(self, event: dict):
+        if event['name'] in self.ports:
+            return None
+        port = self.ports[event['name']] = {
+            'name': event['name'], 'node': event['node'], 'port_no': event.get('port_no'), 'status': 'up'
+        }
+        return {'ports': [port]}
+
+    def _on_port_remove(self, event: dict):
+        name = event['name']
+        if name not in self.ports:
+            return None
+        links = [link['id'] for link in self._links_of_port(name)]
+        for link_id in links:
+            self._remove_link(link_id)
+        del self.ports[name]
+        self._port_links.pop(name, None)
+        self._drop_pending([name])
+        return {'removed_ports': [name], 'removed_links': links}
+
+    def _set_port_status(self, name: str, status: str):
+        port = self.ports.get(name)
+        if port is None or port['status'] == status:
+            return None
+        port['status'] = status
+        changed = []
+        for link in self._links_of_port(name):
+            source = self.ports[link['source_port']]['status']
+            target = self.ports[link['target_port']]['status']
+            link_status = 'up' if source == target == 'up' else 'down'
+            if link['status'] != link_status:
+                link['status'] = link_status
+                changed.append(link)
+        return {'ports': [port], 'links': changed}
+
+    def _on_port_up(self, event: dict):
+        return self._set_port_status(event['name'], 'up')
+
+    def _on_port_down(self, event: dict):
+        return self._set_port_status(event['name'], 'down')
+
+    def _on_link_add(self, event: dict):
+        link = self._add_link(event['source_port'], event['target_port'])
+        return {'links': [link]} if link else None
+
+    def _on_link_remove(self, event: dict):
+        link_id = self.link_id(event['source_port'], event['target_port'])
+        self._pending_links.pop(link_id, None)
+        if not self._remove_link(link_id):
+            return None
+        return {'removed_links': [link_id]}
+
+    def _set_link_status(self, event: dict, status: str):
+        link = self.links.get(self.link_id(event['source_port'], event['target_port']))
+        if link is None or link['status'] == status:
+            return None
+        link['status'] = status
+        return {'links': [link]}
+
+    def _on_link_up(self, event: dict):
+        return self._set_link_status(event, 'up')
+
+    def _on_link_down(self, event: dict):
+        return self._set_link_status(event, 'down')
+
+class EventSource(abc.ABC):
+    """拓扑事件源基类"""
+    @abc.abstractmethod
+    def events(self) -> AsyncIterator[dict]:
+        """异步产生拓扑事件"""
+
+    async def close(self):
+        pass
+
+class FakeEventSource(EventSource):
+    """本地事件源，用于测试或由其他模块直接注入事件"""
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def push(self, event: dict):
+        self.queue.put_nowait(event)
+
+    async def events(self) -> AsyncIterator[dict]:
+        while True:
+            yield await self.queue.get()
+
+class OvsdbEventSource(EventSource):
+    """通过 ovsdb-client monitor 监听 Bridge 和 Interface 表的变化
+
+    链路：端口加入时通过 sysfs 找到 veth 对端，对端也是已知的交换机端口时
+    产生 link_add（每条更新只扫描一遍 sysfs，图中已有链路的端口跳过）；端口删除时图中相关链路随之删除，因此不单独产生
+    link_remove。主机端口位于其他网络命名空间，主机链路只来自初始化时的全量构建。
+
+    ovsdb-client 不存在或退出时记录日志并按指数退避重启；重启后的初始数据
+    与已知集合比对，补发期间遗漏的删除事件。
+    """
+    TABLES = {
+        'Bridge': 'name,datapath_id',
+        'Interface': 'name,ofport,link_state'
+    }
+    SYSFS_NET = '/sys/class/net'
+
+    def __init__(self, database: str = 'Open_vSwitch', max_backoff: float = 60,
+                 graph: Optional[TopologyGraph] = None):
+        self.database = database
+        self.max_backoff = max_backoff
+        self.graph = graph
+        self.processes: Dict[str, asyncio.subprocess.Process] = {}
+        self.known: Dict[str, set] = {table: set() for table in self.TABLES}
+
+    async def events(self) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue()
+        readers = [
+            asyncio.create_task(self._supervise(table, columns, queue))
+            for table, columns in self.TABLES.items()
+        ]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for reader in readers:
+                reader.cancel()
+
+    async def _supervise(self, table: str, columns: str, queue: asyncio.Queue):
+        """运行 monitor，失败或退出后退避重启"""
+        backoff = 1.0
+        while True:
+            try:
+                if await self._monitor(table, columns, queue):
+                    backoff = 1.0
+                logger.warning(f"ovsdb-client monitor {table} 已退出，{backoff:.0f}s 后重启")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ovsdb-client monitor {table} 启动失败: {str(e)}，{backoff:.0f}s 后重试")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _monitor(self, table: str, columns: str, queue: asyncio.Queue) -> bool:
+        """运行一次 monitor 直到退出，返回是否收到过数据"""
+        process = await asyncio.create_subprocess_exec(
+            'ovsdb-client', 'monitor', self.database, table, columns, '--format=json',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        self.processes[table] = process
+        stderr = asyncio.create_task(self._log_stderr(table, process))
+        received = False
+        try:
+            async for line in process.stdout:
+                try:
+                    update = json.loads(line)
+                except ValueError:
+                    continue
+                events = self._parse(table, update)
+                if not received and self._is_initial(update):
+                    # 每次启动的第一条更新是全量初始数据，补发重启期间的删除
+                    events = self._resync(table, update) + events
+                received = True
+                for event in events:
+                    self._track(table, event)
+                    queue.put_nowait(event)
+                for link in self._links_for([event['name'] for event in events if event['type'] == 'port_add']):
+                    queue.put_nowait(link)
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.terminate()
+                await process.wait()
+            await stderr
+            self.processes.pop(table, None)
+        return received
+
+    @staticmethod
+    async def _log_stderr(table: str, process: asyncio.subprocess.Process):
+        async for line in process.stderr:
+            logger.warning(f"ovsdb-client monitor {table}: {line.decode(errors='replace').strip()}")
+
+    @staticmethod
+    def _is_initial(update: dict) -> bool:
+        headings = update.get('headings', [])
+        rows = [dict(zip(headings, row)) for row in update.get('data', [])]
+        return bool(rows) and all(row.get('action') == 'initial' for row in rows)
+
+    def _resync(self, table: str, update: dict) -> List[dict]:
+        headings = update.get('headings', [])
+        current = {dict(zip(headings, row)).get('name') for row in update.get('data', [])}
+        remove_type = 'switch_remove' if table == 'Bridge' else 'port_remove'
+        return [{'type': remove_type, 'name': name} for name in self.known[table] - current]
+
+    def _track(self, table: str, event: dict):
+        if event['type'] in ('switch_add', 'port_add'):
+            self.known[table].add(event['name'])
+        elif event['type'] in ('switch_remove', 'port_remove'):
+            self.known[table].discard(event['name'])
+
+    def _links_for(self, ports: List[str]) -> List[dict]:
+        """新端口的对端也是已知交换机端口时产生 link_add 事件"""
+        if self.graph is not None:
+            ports = [port for port in ports if not self.graph.has_links(port)]
+        if not ports:
+            return []
+        names = self.ifindex_names()
+        links = {}
+        for port in ports:
+            peer = self.veth_peer(port, names)
+            if peer is not None and peer in self.known['Interface']:
+                # 同一次更新中两端都出现时只产生一次
+                links.setdefault(TopologyGraph.link_id(port, peer), {
+                    'type': 'link_add', 'source_port': port, 'target_port': peer
+                })
+        return list(links.values())
+
+    @classmethod
+    def ifindex_names(cls) -> Dict[str, str]:
+        """当前命名空间中 ifindex -> 网卡名"""
+        names = {}
+        try:
+            candidates = os.listdir(cls.SYSFS_NET)
+        except OSError:
+            return names
+        for candidate in candidates:
+            try:
+                with open(os.path.join(cls.SYSFS_NET, candidate, 'ifindex')) as f:
+                    names[f.read().strip()] = candidate
+            except OSError:
+                continue
+        return names
+
+    @classmethod
+    def veth_peer(cls, name: str, names: Dict[str, str]) -> Optional[str]:
+        """通过 sysfs 的 iflink 查找 veth 对端，names 为 ifindex_names 的结果"""
+        try:
+            with open(os.path.join(cls.SYSFS_NET, name, 'iflink')) as f:
+                iflink = f.read().strip()
+        except OSError:
+            return None
+        peer = names.get(iflink)
+        return None if peer == name else peer
+
+    @staticmethod
+    def _parse(table: str, update: dict) -> List[dict]:
+        headings = update.get('headings', [])
+        events = []
+        for row in update.get('data', []):
+            record = dict(zip(headings, row))
+            action = record.get('action')
+            name = record.get('name')
+            if not name:
+                continue
+            if table == 'Bridge':
+                if action in ('initial', 'insert'):
+                    events.append({'type': 'switch_add', 'name': name, 'dpid': record.get('datapath_id')})
+                elif action == 'delete':
+                    events.append({'type': 'switch_remove', 'name': name})
+                continue
+
+            # Mininet 的交换机端口名形如 s1-eth1；与网桥同名的是内部端口
+            if '-' not in name:
+                continue
+            if action in ('initial', 'insert'):
+                events.append({'type': 'port_add', 'name': name, 'node': name.split('-')[0], 'port_no': record.get('ofport')})
+            elif action == 'delete':
+                events.append({'type': 'port_remove', 'name': name})
+                continue
+            elif action != 'new':
+                # 修改时 old 行只含旧值
+                continue
+            link_state = record.get('link_state')
+            if link_state in ('up', 'down'):
+                events.append({'type': f'port_{link_state}', 'name': name})
+        return events
+
+    async def close(self):
+        for process in list(self.processes.values()):
+            if process.returncode is None:
+                process.terminate()
+                await process.wait()
+        self.processes.clear()
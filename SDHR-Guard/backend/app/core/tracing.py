@@ -0,0 +1,99 @@
+"""控制器切换过程的分阶段追踪
+
+每个操作（启动、停止、切换）是一条 trace，各阶段是其中的 span。
+span 保存在有界的内存缓冲区中，可导出为 JSON 或 Chrome trace 格式
+（chrome://tracing / Perfetto 可直接打开），并按阶段汇总延迟分位数。
+"""
+import contextvars
+import itertools
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 当前所在的 (trace_id, span_id)，嵌套的 span 自动挂到父 span 下
+_current = contextvars.ContextVar('current_span', default=None)
+
+class Tracer:
+    def __init__(self, max_spans: int = 5000):
+        self.spans = deque(maxlen=max_spans)
+        self.version = 0
+        self._ids = itertools.count(1)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """记录一个阶段；不在任何 span 内时开启一条新的 trace"""
+        parent = _current.get()
+        span_id = next(self._ids)
+        trace_id = parent[0] if parent else span_id
+        token = _current.set((trace_id, span_id))
+        start = time.time()
+        begin = time.perf_counter()
+        record = {
+            'trace_id': trace_id,
+            'span_id': span_id,
+            'parent_id': parent[1] if parent else None,
+            'name': name,
+            'start': start,
+            'duration_ms': 0.0,
+            'attrs': attrs
+        }
+        try:
+            yield record
+        except BaseException as e:
+            record['attrs']['error'] = str(e) or type(e).__name__
+            raise
+        finally:
+            record['duration_ms'] = (time.perf_counter() - begin) * 1000
+            _current.reset(token)
+            self.spans.append(record)
+            self.version += 1
+
+    def export_json(self, limit: Optional[int] = None) -> List[dict]:
+        """导出最近的 span"""
+        spans = list(self.spans)
+        return spans[-limit:] if limit else spans
+
+    def export_chrome(self, limit: Optional[int] = None) -> dict:
+        """导出为 Chrome trace 格式，每条 trace 占一行"""
+        events = [
+            {
+                'name': span['name'],
+                'cat': span['name'].split('.')[0],
+                'ph': 'X',
+                'ts': span['start'] * 1e6,
+                'dur': span['duration_ms'] * 1e3,
+                'pid': 1,
+                'tid': span['trace_id'],
+                'args': span['attrs']
+            }
+            for span in self.export_json(limit)
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self) -> Dict[str, dict]:
+        """按阶段汇总延迟分位数(ms)"""
+        durations: Dict[str, List[float]] = {}
+        for span in self.spans:
+            durations.setdefault(span['name'], []).append(span['duration_ms'])
+
+        result = {}
+        for name, values in sorted(durations.items()):
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'mean': round(sum(values) / len(values), 3),
+                'p50': round(_percentile(values, 50), 3),
+                'p90': round(_percentile(values, 90), 3),
+                'p99': round(_percentile(values, 99), 3),
+                'max': round(values[-1], 3)
+            }
+        return result
+
+def _percentile(values: List[float], q: float) -> float:
+    """最近秩法求分位数，values 需已排序"""
+    rank = max(int(-(-q * len(values) // 100)), 1)
+    return values[rank - 1]
+
+# 全局追踪器实例
+tracer = Tracer()
@@ -0,0 +1,155 @@
+"""路径索引基准测试
+
+在生成的 fat-tree / leaf-spine / grid 拓扑上测量 PathIndex：
+    build       从 TopologyGraph 加载并构建 CSR
+    warmup      全部节点对的跳数/下一跳首次查询（每个源一次 BFS）
+    all_pairs   预热后再次查询全部节点对（只查缓存的 BFS 树）
+    shortest    随机交换机对展开为完整路径（节点序列和逐跳端口）
+    k_shortest  随机交换机对的 k 条最短路径（首次 / 缓存命中）
+    disjoint    随机交换机对的链路不相交路径（首次 / 缓存命中）
+    flap        随机链路 down/up 一次后的选择性失效与重新查询
+    peak_rss    进程峰值常驻内存（MB），BFS 树缓存受 max_trees 限制
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_paths --switches 1000 --pairs 200 --k 4
+"""
+import argparse
+import random
+import resource
+import time
+
+from app.core.paths import PathIndex
+from app.core.topology_events import TopologyGraph
+
+class _Builder:
+    """通过事件构建拓扑图"""
+    def __init__(self):
+        self.graph = TopologyGraph()
+        self.port_counts = {}
+        self.links = []
+
+    def switch(self, name: str):
+        self.graph.apply({'type': 'switch_add', 'name': name})
+        return name
+
+    def _port(self, node: str) -> str:
+        port_no = self.port_counts[node] = self.port_counts.get(node, 0) + 1
+        name = f"{node}-eth{port_no}"
+        self.graph.apply({'type': 'port_add', 'name': name, 'node': node, 'port_no': port_no})
+        return name
+
+    def link(self, a: str, b: str):
+        ports = (self._port(a), self._port(b))
+        self.graph.apply({'type': 'link_add', 'source_port': ports[0], 'target_port': ports[1]})
+        self.links.append(ports)
+
+def fat_tree(switches: int) -> _Builder:
+    """k 叉 fat-tree，交换机数为 5k²/4，取不超过目标的最大偶数 k"""
+    k = 2
+    while 5 * (k + 2) ** 2 // 4 <= switches:
+        k += 2
+    builder = _Builder()
+    half = k // 2
+    cores = [builder.switch(f"c{i}") for i in range(half * half)]
+    for pod in range(k):
+        aggs = [builder.switch(f"a{pod}_{i}") for i in range(half)]
+        edges = [builder.switch(f"e{pod}_{i}") for i in range(half)]
+        for i, agg in enumerate(aggs):
+            for edge in edges:
+                builder.link(agg, edge)
+            for j in range(half):
+                builder.link(agg, cores[i * half + j])
+    return builder
+
+def leaf_spine(switches: int) -> _Builder:
+    """spine 数约为总数的 1/25，每个 leaf 连接所有 spine"""
+    spine_count = max(switches // 25, 2)
+    builder = _Builder()
+    spines = [builder.switch(f"sp{i}") for i in range(spine_count)]
+    for i in range(switches - spine_count):
+        leaf = builder.switch(f"lf{i}")
+        for spine in spines:
+            builder.link(leaf, spine)
+    return builder
+
+def grid(switches: int) -> _Builder:
+    side = max(int(switches ** 0.5), 2)
+    builder = _Builder()
+    for row in range(side):
+        for col in range(side):
+            builder.switch(f"g{row}_{col}")
+            if row:
+                builder.link(f"g{row - 1}_{col}", f"g{row}_{col}")
+            if col:
+                builder.link(f"g{row}_{col - 1}", f"g{row}_{col}")
+    return builder
+
+TOPOLOGIES = {'fat-tree': fat_tree, 'leaf-spine': leaf_spine, 'grid': grid}
+
+def _timed(func):
+    begin = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - begin) * 1000, result
+
+def run(name: str, switches: int, pairs: int, k: int, seed: int, max_trees: int):
+    builder = TOPOLOGIES[name](switches)
+    graph = builder.graph
+    nodes = list(graph.nodes)
+    rng = random.Random(seed)
+    sample = [tuple(rng.sample(nodes, 2)) for _ in range(pairs)]
+
+    build_ms, index = _timed(lambda: PathIndex(graph, max_trees=max_trees))
+    index._ensure()
+
+    warmup_ms, _ = _timed(index.all_pairs)
+    cached_ms, _ = _timed(index.all_pairs)
+    shortest_ms, _ = _timed(lambda: [index.shortest_path(s, t) for s, t in sample])
+
+    results = {
+        'build': build_ms,
+        'warmup': warmup_ms,
+        'all_pairs': cached_ms,
+        'all_pairs_per_pair_ns': cached_ms * 1000000 / len(nodes) ** 2,
+        'shortest_per_query_us': shortest_ms * 1000 / pairs
+    }
+    for label, query in (('k_shortest', index.k_shortest_paths), ('disjoint', index.disjoint_paths)):
+        cold_ms, _ = _timed(lambda: [query(s, t, k) for s, t in sample])
+        warm_ms, _ = _timed(lambda: [query(s, t, k) for s, t in sample])
+        results[f'{label}_cold_per_query'] = cold_ms / pairs
+        results[f'{label}_cached_per_query'] = warm_ms / pairs
+
+    # 单条链路闪断：失效只影响用到它的缓存
+    source_port, target_port = rng.choice(builder.links)
+    trees_before = len(index._trees)
+    flap_ms, _ = _timed(lambda: (
+        graph.apply({'type': 'link_down', 'source_port': source_port, 'target_port': target_port}),
+        graph.apply({'type': 'link_up', 'source_port': source_port, 'target_port': target_port})
+    ))
+    results['flap'] = flap_ms
+    results['trees_kept'] = f"{len(index._trees)}/{trees_before}"
+    requery_ms, _ = _timed(index.all_pairs)
+    results['all_pairs_after_flap'] = requery_ms
+    # Linux 上 ru_maxrss 单位为 KB
+    results['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"\n{name}: {len(nodes)} 交换机, {len(graph.links)} 链路")
+    for key, value in results.items():
+        print(f"  {key:<28} {value:>12.3f}" if isinstance(value, float) else f"  {key:<28} {value:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description="PathIndex 基准测试")
+    parser.add_argument('--topology', choices=list(TOPOLOGIES) + ['all'], default='all')
+    parser.add_argument('--switches', type=int, default=1000, help="目标交换机数")
+    parser.add_argument('--pairs', type=int, default=200, help="路径展开和 k 路径查询的随机节点对数")
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-trees', type=int, default=1024, help="BFS 树缓存上限")
+    args = parser.parse_args()
+
+    names = list(TOPOLOGIES) if args.topology == 'all' else [args.topology]
+    print("时间单位: ms（*_us 为微秒，*_ns 为纳秒）")
+    for name in names:
+        run(name, args.switches, args.pairs, args.k, args.seed, args.max_trees)
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
-"""
-Configuration module for SDN DHR Defense System
-包含系统配置和设置
-"""
-
-from .settings import settings
-
+"""
+Configuration module for SDN DHR Defense System
+包含系统配置和设置
+"""
+
+from .settings import settings
+
 __all__ = ['settings'] 
\ No newline at end of file
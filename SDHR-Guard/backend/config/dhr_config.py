@@ -1,74 +1,92 @@
-"""DHR配置文件"""
-
-DHR_CONFIG = {
-    # 控制器配置
-    'min_controllers': 2,  # 最小控制器数量
-    'max_controllers': 5,  # 最大控制器数量
-    
-    # 调度配置
-    'schedule_interval': 5,    # 调度检查间隔(秒)
-    'sync_interval': 30,       # 配置同步间隔(秒)
-    'switch_cooldown': 10,     # 切换冷却时间(秒)
-    
-    # 性能阈值
-    'thresholds': {
-        'cpu_load': 0.8,       # CPU负载阈值
-        'memory_usage': 0.8,   # 内存使用阈值
-        'response_time': 1000, # 响应时间阈值(ms)
-        'error_rate': 0.1      # 错误率阈值
-    },
-    
-    # 调度策略配置
-    'scheduler': {
-        'default_strategy': 'health_aware',  # 默认调度策略
-        'strategies': [
-            'round_robin',     # 轮询调度
-            'health_aware',    # 健康感知调度
-            'diversity_aware'  # 异构感知调度
-        ],
-        'weights': {
-            'health_score': 0.4,    # 健康度权重
-            'diversity_score': 0.3,  # 异构度权重
-            'load_score': 0.3       # 负载权重
-        }
-    },
-    
-    # 监控��置
-    'monitoring': {
-        'metrics_interval': 5,     # 指标收集间隔(秒)
-        'health_check_interval': 10 # 健康检查间隔(秒)
-    },
-    
-    # 安全配置
-    'security': {
-        'max_retry_attempts': 3,    # 最大重试次数
-        'block_threshold': 5,       # 阻断阈值
-        'alert_threshold': 3        # 告警阈值
-    }
-}
-
-# 控制器类型配置
-CONTROLLER_TYPES = {
-    'ryu': {
-        'class': 'RyuController',
-        'default_port': 6633,
-        'features': ['openflow', 'rest-api']
-    },
-    'pox': {
-        'class': 'POXController',
-        'default_port': 6634,
-        'features': ['openflow']
-    },
-    'opendaylight': {
-        'class': 'OpenDaylightController',
-        'default_port': 6653,
-        'features': ['openflow', 'rest-api', 'clustering']
-    }
-}
-
-# 日志配置
-LOGGING_CONFIG = {
-    'level': 'INFO',
-    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'handlers': ['file', 'console']
+"""DHR配置文件"""
+
+DHR_CONFIG = {
+    # 控制器配置
+    'min_controllers': 2,  # 最小控制器数量
+    'max_controllers': 5,  # 最大控制器数量
+    
+    # 调度配置
+    'schedule_interval': 5,    # 调度检查间隔(秒)
+    'sync_interval': 30,       # 配置同步间隔(秒)
+    'sync_batch_size': 100,    # 每批同步的流表变更数
+    'sync_log_size': 100000,   # 保留的流表变更日志条数，落后更多的备用控制器全量同步
+    'switch_cooldown': 10,     # 切换冷却时间(秒)
+    'switch_min_reconnect': 1.0, # 切换时至少重连的交换机比例，不足则回滚
+    
+    # 性能阈值
+    'thresholds': {
+        'cpu_load': 0.8,       # CPU负载阈值
+        'memory_usage': 0.8,   # 内存使用阈值
+        'response_time': 1000, # 响应时间阈值(ms)
+        'error_rate': 0.1      # 错误率阈值
+    },
+    
+    # 调度策略配置
+    'scheduler': {
+        'default_strategy': 'health_aware',  # 默认调度策略
+        'strategies': [
+            'round_robin',     # 轮询调度
+            'health_aware',    # 健康感知调度
+            'diversity_aware'  # 异构感知调度
+        ],
+        'weights': {
+            'health_score': 0.4,    # 健康度权重
+            'diversity_score': 0.3,  # 异构度权重
+            'load_score': 0.3       # 负载权重
+        }
+    },
+    
+    # 监控��置
+    'monitoring': {
+        'metrics_interval': 5,     # 指标收集间隔(秒)
+        'health_check_interval': 10, # 健康检查间隔(秒)
+        'history_max_points': 120960, # 历史数据保留点数(按5秒间隔约7天)
+        # 各交换机分摊 history_max_points，每台至少保留的点数(按5秒间隔约1小时)
+        'history_min_switch_points': 720,
+        # 自适应采集：各交换机间隔在 [min_interval, max_interval] 内调整，
+        # 平稳时回到 metrics_interval
+        'collection': {
+            'min_interval': 1,       # 最短采集间隔(秒)
+            'max_interval': 60,      # 最长采集间隔(秒)
+            'dpctl_budget': 20,      # 全局dpctl调用上限(次/秒)
+            'cpu_ceiling': 0.25,     # 采集耗时占比上限(单核)
+            'ewma_alpha': 0.3,       # 速率均值/方差的平滑系数
+            'anomaly_z': 3.0,        # 速率z分数超过此值视为异常
+            'variance_cv': 0.5,      # 速率变异系数超过此值时加快采样
+            'idle_rate': 1024        # 低于此速率(字节/秒)视为空闲
+        }
+    },
+    
+    # 安全配置
+    'security': {
+        'max_retry_attempts': 3,    # 最大重试次数
+        'block_threshold': 5,       # 阻断阈值
+        'alert_threshold': 3        # 告警阈值
+    }
+}
+
+# 控制器类型配置
+CONTROLLER_TYPES = {
+    'ryu': {
+        'class': 'RyuController',
+        'default_port': 6633,
+        'features': ['openflow', 'rest-api']
+    },
+    'pox': {
+        'class': 'POXController',
+        'default_port': 6634,
+        'features': ['openflow']
+    },
+    'opendaylight': {
+        'class': 'OpenDaylightController',
+        'default_port': 6653,
+        'features': ['openflow', 'rest-api', 'clustering']
+    }
+}
+
+# 日志配置
+LOGGING_CONFIG = {
+    'level': 'INFO',
+    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'handlers': ['file', 'console']
 } 
\ No newline at end of file
@@ -1,57 +1,75 @@
-from dotenv import load_dotenv
-import os
-from typing import Dict
-
-class Settings:
-    def __init__(self):
-        # 从 .env 文件加载环境变量
-        load_dotenv()
-        
-        # 读取环境变量
-        self.RYU_PATH = os.getenv("RYU_PATH")
-        self.POX_PATH = os.getenv("POX_PATH")
-        self.ODL_PATH = os.getenv("ODL_PATH")
-        
-        # 控制器端口配置
-        self.RYU_PORT = int(os.getenv("RYU_PORT", 6653))
-        self.POX_PORT = int(os.getenv("POX_PORT", 6633))
-        self.ODL_PORT = int(os.getenv("ODL_PORT", 6633))
-        
-        # 控制器应用配置
-        self.RYU_APP = os.getenv("RYU_APP", "ryu.app.simple_switch_13")
-        self.POX_APP = os.getenv("POX_APP", "forwarding.l2_learning")
-        self.ODL_APP = os.getenv("ODL_APP", "")
-        
-        # 系统配置
-        self.MININET_ENABLED = os.getenv("MININET_ENABLED", "true").lower() == "true"
-        self.DEBUG = os.getenv("DEBUG", "true").lower() == "true"
-        
-        # API配置
-        self.API_V1_STR = os.getenv("API_V1_STR", "/api/v1")
-        self.HOST = os.getenv("HOST", "0.0.0.0")
-        self.PORT = int(os.getenv("PORT", 8000))
-        
-        # 日志配置
-        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-        
-        # 控制器配置
-        self.CONTROLLERS: Dict[str, dict] = {
-            'ryu': {
-                'path': self.RYU_PATH,
-                'port': self.RYU_PORT,
-                'app': self.RYU_APP
-            },
-            'pox': {
-                'path': self.POX_PATH,
-                'port': self.POX_PORT,
-                'app': self.POX_APP
-            },
-            'odl': {
-                'path': self.ODL_PATH,
-                'port': self.ODL_PORT,
-                'app': self.ODL_APP
-            }
-        }
-
-# 创建全局设置实例
+from dotenv import load_dotenv
+import os
+from typing import Dict
+
+class Settings:
+    def __init__(self):
+        # 从 .env 文件加载环境变量
+        load_dotenv()
+        
+        # 读取环境变量
+        self.RYU_PATH = os.getenv("RYU_PATH")
+        self.POX_PATH = os.getenv("POX_PATH")
+        self.ODL_PATH = os.getenv("ODL_PATH")
+        
+        # 控制器端口配置
+        self.RYU_PORT = int(os.getenv("RYU_PORT", 6653))
+        self.POX_PORT = int(os.getenv("POX_PORT", 6633))
+        self.ODL_PORT = int(os.getenv("ODL_PORT", 6633))
+        
+        # 控制器应用配置
+        self.RYU_APP = os.getenv("RYU_APP", "ryu.app.simple_switch_13")
+        self.POX_APP = os.getenv("POX_APP", "forwarding.l2_learning")
+        self.ODL_APP = os.getenv("ODL_APP", "")
+        
+        # ODL RESTCONF 配置（用于向备用 ODL 同步流表）
+        self.ODL_RESTCONF_URL = os.getenv("ODL_RESTCONF_URL", "http://127.0.0.1:8181/restconf")
+        self.ODL_USER = os.getenv("ODL_USER", "admin")
+        self.ODL_PASSWORD = os.getenv("ODL_PASSWORD", "admin")
+        
+        # 系统配置
+        self.MININET_ENABLED = os.getenv("MININET_ENABLED", "true").lower() == "true"
+        self.DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+        
+        # API配置
+        self.API_V1_STR = os.getenv("API_V1_STR", "/api/v1")
+        self.HOST = os.getenv("HOST", "0.0.0.0")
+        self.PORT = int(os.getenv("PORT", 8000))
+        
+        # 多进程部署配置
+        # standalone: 单进程；worker: 只读API进程，状态来自 supervisor.py 发布的共享内存快照
+        self.RUN_MODE = os.getenv("RUN_MODE", "standalone")
+        self.SNAPSHOT_PREFIX = os.getenv("SNAPSHOT_PREFIX", "sdhr")
+        self.SNAPSHOT_SEGMENT_SIZE = int(os.getenv("SNAPSHOT_SEGMENT_SIZE", 64 * 1024 * 1024))
+        self.SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", 1.0))
+        # 逐流统计数据量大，发布间隔长于其他快照
+        self.SNAPSHOT_TABLES_INTERVAL = float(os.getenv("SNAPSHOT_TABLES_INTERVAL", 10.0))
+        self.SUPERVISOR_ADDRESS = os.getenv("SUPERVISOR_ADDRESS", "/tmp/sdhr-supervisor.sock")
+        # 命令通道的认证密钥，必须通过环境变量提供（supervisor 与 worker 使用同一个值）
+        authkey = os.getenv("SUPERVISOR_AUTHKEY")
+        self.SUPERVISOR_AUTHKEY = authkey.encode() if authkey else None
+        
+        # 日志配置
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        
+        # 控制器配置
+        self.CONTROLLERS: Dict[str, dict] = {
+            'ryu': {
+                'path': self.RYU_PATH,
+                'port': self.RYU_PORT,
+                'app': self.RYU_APP
+            },
+            'pox': {
+                'path': self.POX_PATH,
+                'port': self.POX_PORT,
+                'app': self.POX_APP
+            },
+            'odl': {
+                'path': self.ODL_PATH,
+                'port': self.ODL_PORT,
+                'app': self.ODL_APP
+            }
+        }
+
+# 创建全局设置实例
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""supervisor 进程
+
+独占控制器子进程、Mininet 网络和采集循环，把状态快照发布到共享内存，
+供多个只读 API worker 进程使用：
+
+    export SUPERVISOR_AUTHKEY=$(openssl rand -hex 32)
+    python supervisor.py
+    RUN_MODE=worker uvicorn main:app --workers 4
+"""
+import asyncio
+import logging
+import signal
+import time
+
+from config.settings import settings
+from config.dhr_config import DHR_CONFIG
+from app.core.controller import ControllerManager
+from app.core.topology import TopologyManager
+from app.core.monitor import FlowMonitor
+from app.core.collector import CollectionScheduler
+from app.core.dashboard import DashboardSummary
+from app.core.snapshot import SnapshotPublisher
+from app.core.tracing import tracer
+from app.core.sync import FlowSyncEngine
+from app.core.remote import CommandServer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 事件类型对应需要重新发布的快照
+DIRTY_SECTIONS = {
+    'controller': ('controllers',),
+    'topology': ('topology',),
+    'flow': ('flow_history', 'flow_tables', 'collector'),
+    'switch_removed': ('flow_history', 'collector')
+}
+
+class Supervisor:
+    def __init__(self):
+        self.controller_manager = ControllerManager()
+        self.topology_manager = TopologyManager()
+        self.flow_monitor = FlowMonitor()
+        self.flow_monitor.attach(self.topology_manager)
+        self.dashboard_summary = DashboardSummary()
+        self.dashboard_summary.attach(
+            controller_manager=self.controller_manager,
+            topology_manager=self.topology_manager,
+            flow_monitor=self.flow_monitor
+        )
+        for manager in (self.controller_manager, self.topology_manager, self.flow_monitor):
+            manager.add_listener(self._mark_dirty)
+        self.controller_manager.reconnect_handler = self.topology_manager.reconnect_switches
+        self.flow_sync = FlowSyncEngine(self.controller_manager)
+        self.controller_manager.sync_handler = self.flow_sync.sync_controller
+        self.controller_manager.add_listener(self.flow_sync.on_event)
+        self.flow_monitor.add_listener(self.flow_sync.on_event)
+        self.collector = CollectionScheduler()
+        self.collector.attach(self.flow_monitor, self.topology_manager)
+
+        self.publisher = SnapshotPublisher(settings.SNAPSHOT_PREFIX, settings.SNAPSHOT_SEGMENT_SIZE)
+        self.command_server = CommandServer(
+            settings.SUPERVISOR_ADDRESS,
+            settings.SUPERVISOR_AUTHKEY,
+            {
+                'start_controller': self.controller_manager.start_controller,
+                'stop_controller': self.controller_manager.stop_controller,
+                'switchover': self.controller_manager.switchover,
+                'collect_stats': self.flow_monitor.collect_stats,
+                'find_paths': self.topology_manager.find_paths
+            }
+        )
+        self._dirty = {section for sections in DIRTY_SECTIONS.values() for section in sections}
+        self._dashboard_version = None
+        self._trace_version = None
+        self._tables_published = 0.0
+
+    def _mark_dirty(self, event: dict):
+        self._dirty.update(DIRTY_SECTIONS.get(event.get('type'), ()))
+
+    def publish(self):
+        """发布自上次以来有变化的快照"""
+        dirty, self._dirty = self._dirty, set()
+        if 'controllers' in dirty:
+            self.publisher.publish('controllers', self.controller_manager.get_all_status())
+        if 'topology' in dirty:
+            self.publisher.publish('topology', {
+                'topology': self.topology_manager.get_current_topology(),
+                'stats': self.topology_manager.get_statistics(),
+                'version': self.topology_manager.graph.version,
+                'deltas': list(self.topology_manager.graph.deltas)
+            })
+        if 'flow_history' in dirty:
+            self.publisher.publish('flow_history', self.flow_monitor.flow_stats)
+        if 'flow_tables' in dirty:
+            # 逐流统计按较慢的节奏发布，未到时间的留到下一轮
+            if time.monotonic() - self._tables_published >= settings.SNAPSHOT_TABLES_INTERVAL:
+                self._tables_published = time.monotonic()
+                self.publisher.publish('flow_tables', self.flow_monitor.flow_tables)
+            else:
+                self._dirty.add('flow_tables')
+        if 'collector' in dirty:
+            self.publisher.publish('collector', self.collector.get_status())
+        if self.dashboard_summary.version != self._dashboard_version:
+            self._dashboard_version = self.dashboard_summary.version
+            self.publisher.publish_raw('dashboard', self.dashboard_summary.encoded)
+        if tracer.version != self._trace_version:
+            self._trace_version = tracer.version
+            self.publisher.publish('traces', tracer.spans)
+
+    async def _publish_loop(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"发布快照失败: {str(e)}")
+            await asyncio.sleep(settings.SNAPSHOT_INTERVAL)
+
+    async def _health_loop(self):
+        interval = DHR_CONFIG['monitoring']['health_check_interval']
+        while True:
+            for controller_id, controller in self.controller_manager.controllers.items():
+                if controller['status'] == 'running':
+                    await self.controller_manager.health_check(controller_id)
+            await asyncio.sleep(interval)
+
+    async def run(self):
+        logger.info("正在启动 supervisor...")
+        await self.dashboard_summary.start()
+        await self.flow_sync.start()
+        await self.controller_manager.validate_paths()
+        await self.topology_manager.initialize()
+        await self.topology_manager.start_event_feed()
+        await self.collector.start()
+        self.publish()
+
+        loop = asyncio.get_running_loop()
+        self.command_server.start(loop)
+        tasks = [
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._health_loop())
+        ]
+
+        stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+        logger.info("supervisor 已启动")
+        await stop_event.wait()
+
+        logger.info("正在关闭 supervisor...")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.command_server.close()
+        await self.collector.stop()
+        try:
+            for controller_id in self.controller_manager.controllers:
+                await self.controller_manager.stop_controller(controller_id)
+            await self.topology_manager.cleanup()
+        finally:
+            await self.flow_sync.stop()
+            await self.dashboard_summary.stop()
+            self.publisher.close()
+        logger.info("supervisor 已关闭")
+
+if __name__ == '__main__':
+    asyncio.run(Supervisor().run())
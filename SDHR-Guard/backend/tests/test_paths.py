@@ -0,0 +1,104 @@
+"""PathIndex 查询与选择性失效的测试"""
+import random
+
+from app.core.paths import PathIndex
+from app.core.topology_events import TopologyGraph
+
+class _Fabric:
+    """通过事件构建拓扑图"""
+    def __init__(self):
+        self.graph = TopologyGraph()
+        self.port_counts = {}
+        self.links = []
+
+    def switch(self, name):
+        self.graph.apply({'type': 'switch_add', 'name': name})
+
+    def _port(self, node):
+        port_no = self.port_counts[node] = self.port_counts.get(node, 0) + 1
+        name = f"{node}-eth{port_no}"
+        self.graph.apply({'type': 'port_add', 'name': name, 'node': node, 'port_no': port_no})
+        return name
+
+    def link(self, a, b):
+        ports = (self._port(a), self._port(b))
+        self.graph.apply({'type': 'link_add', 'source_port': ports[0], 'target_port': ports[1]})
+        self.links.append(ports)
+        return ports
+
+    def flap(self, ports, status):
+        self.graph.apply({'type': f'link_{status}', 'source_port': ports[0], 'target_port': ports[1]})
+
+def _ring(size):
+    """s0..s{size-1} 成环，外加 s0-s2 的弦"""
+    fabric = _Fabric()
+    for i in range(size):
+        fabric.switch(f"s{i}")
+    for i in range(size):
+        fabric.link(f"s{i}", f"s{(i + 1) % size}")
+    fabric.link('s0', 's2')
+    return fabric
+
+def _lengths(paths):
+    return [path['length'] for path in paths]
+
+def _assert_matches_fresh(index, graph, pairs, k):
+    fresh = PathIndex()
+    fresh.load(graph)
+    for source, target in pairs:
+        assert index.distance(source, target) == fresh.distance(source, target)
+        assert _lengths(index.k_shortest_paths(source, target, k)) == _lengths(fresh.k_shortest_paths(source, target, k))
+        cached = sorted(_lengths(index.disjoint_paths(source, target, k)))
+        assert cached == sorted(_lengths(fresh.disjoint_paths(source, target, k)))
+
+def test_shortest_path_hops():
+    fabric = _ring(5)
+    index = PathIndex(fabric.graph)
+    path = index.shortest_path('s0', 's3')
+    assert path['nodes'] == ['s0', 's4', 's3']
+    assert path['hops'] == [{'node': 's0', 'port': 's0-eth2'}, {'node': 's4', 'port': 's4-eth1'}]
+    assert index.shortest_path('s0', 's0')['length'] == 0
+
+def test_link_flap_invalidates_only_affected_entries():
+    fabric = _ring(6)
+    index = PathIndex(fabric.graph)
+    chord = fabric.links[-1]
+    assert _lengths(index.k_shortest_paths('s0', 's2', 2)) == [1, 2]
+    assert len(index.disjoint_paths('s0', 's2', 3)) == 3
+    unrelated = index.k_shortest_paths('s3', 's4', 1)
+
+    fabric.flap(chord, 'down')
+    assert _lengths(index.k_shortest_paths('s0', 's2', 2)) == [2, 4]
+    assert len(index.disjoint_paths('s0', 's2', 3)) == 2
+    # 不经过该链路的缓存项保持不变
+    assert index.k_shortest_paths('s3', 's4', 1) is unrelated
+
+    fabric.flap(chord, 'up')
+    assert _lengths(index.k_shortest_paths('s0', 's2', 2)) == [1, 2]
+    assert len(index.disjoint_paths('s0', 's2', 3)) == 3
+
+def test_random_flaps_match_fresh_index():
+    rng = random.Random(7)
+    fabric = _Fabric()
+    for i in range(12):
+        fabric.switch(f"s{i}")
+    for _ in range(24):
+        a, b = rng.sample(range(12), 2)
+        fabric.link(f"s{a}", f"s{b}")
+    index = PathIndex(fabric.graph, max_trees=4)
+    names = [f"s{i}" for i in range(12)]
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(20)]
+    _assert_matches_fresh(index, fabric.graph, pairs, 3)
+    for _ in range(40):
+        fabric.flap(rng.choice(fabric.links), rng.choice(['down', 'up']))
+        _assert_matches_fresh(index, fabric.graph, pairs, 3)
+
+def test_all_pairs_next_hops():
+    fabric = _ring(4)
+    index = PathIndex(fabric.graph)
+    table = index.all_pairs()
+    dist, following_hop = table['s1']
+    ids = {name: i for i, name in enumerate(index.names)}
+    assert dist[ids['s3']] == 2
+    assert index.names[following_hop[ids['s3']]] in ('s0', 's2')
+    assert dist[ids['s1']] == 0 and following_hop[ids['s1']] == -1
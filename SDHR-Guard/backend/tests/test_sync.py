@@ -0,0 +1,67 @@
+"""FlowSyncEngine 变更日志的测试"""
+import asyncio
+
+from app.core.sync import FlowSyncEngine
+
+FLOW_A = 'priority=1,in_port=1 actions=output:2'
+FLOW_B = 'priority=1,in_port=2 actions=output:1'
+
+class _Applier:
+    def __init__(self):
+        self.batches = []
+
+    async def apply(self, ops):
+        self.batches.append(ops)
+
+def _engine(log_size=100):
+    return FlowSyncEngine(None, interval=1, batch_size=100, log_size=log_size)
+
+def test_add_then_remove_cancels():
+    engine = _engine()
+    engine._record('s1', '1', [FLOW_B], [])
+    cursor = engine.version
+    engine._record('s1', '1', [FLOW_A], [])
+    engine._record('s1', '1', [], [FLOW_A])
+    assert engine._pending(cursor) == []
+
+def test_repeated_changes_keep_net_effect():
+    engine = _engine()
+    engine._record('s1', '1', [FLOW_A], [])
+    cursor = engine.version
+    engine._record('s1', '1', [], [FLOW_A])
+    engine._record('s1', '1', [FLOW_A, FLOW_B], [])
+    engine._record('s1', '1', [], [FLOW_B])
+    # FLOW_A 删除后又添加，净效果为添加；FLOW_B 添加后删除，互相抵消
+    assert engine._pending(cursor) == [('add', 's1', FLOW_A)]
+    assert engine._pending(engine.version) == []
+
+def test_lagging_cursor_falls_back_to_full_resync():
+    engine = _engine(log_size=2)
+    engine._record('s1', '1', [FLOW_A], [])
+    engine._record('s2', '2', [FLOW_B], [])
+    engine._record('s2', '2', [], [FLOW_B])
+    # 版本 1 已被裁出日志
+    ops = engine._pending(0)
+    assert sorted(op for op in ops if op[0] == 'clear') == [('clear', 's1', None), ('clear', 's2', None)]
+    assert [op for op in ops if op[0] != 'clear'] == [('add', 's1', FLOW_A)]
+    assert engine._pending(None) == ops
+
+def test_switchover_forces_full_resync_of_both_controllers():
+    engine = _engine()
+    engine._record('s1', '1', [FLOW_A], [])
+    engine.cursors = {'odl': engine.version, 'ryu': engine.version}
+    engine.on_event({'type': 'switchover', 'from': 'odl', 'to': 'ryu'})
+    assert engine.cursors == {}
+    assert engine._pending(engine.cursors.get('odl'))[0] == ('clear', 's1', None)
+
+def test_sync_controller_advances_cursor():
+    engine = _engine()
+    applier = engine.appliers['odl'] = _Applier()
+    engine._record('s1', '0000000000000001', [FLOW_A], [])
+    assert asyncio.run(engine.sync_controller('odl')) == 2
+    assert applier.batches == [[('clear', '0000000000000001', None), ('add', '0000000000000001', FLOW_A)]]
+    assert engine.cursors['odl'] == engine.version
+
+    engine._record('s1', '0000000000000001', [], [FLOW_A])
+    assert asyncio.run(engine.sync_controller('odl')) == 1
+    assert applier.batches[-1] == [('remove', '0000000000000001', FLOW_A)]
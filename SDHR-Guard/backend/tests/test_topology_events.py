@@ -0,0 +1,179 @@
+"""TopologyGraph 与事件源的测试"""
+import asyncio
+
+import pytest
+
+from app.core.paths import PathIndex
+from app.core.topology_events import FakeEventSource, OvsdbEventSource, TopologyGraph
+
+class _Intf:
+    def __init__(self, name, node):
+        self.name = name
+        self.node = node
+
+class _Node:
+    def __init__(self, name):
+        self.name = name
+        self.intfs = {}
+        self.dpid = '0000000000000001'
+
+    def IP(self):
+        return '10.0.0.1'
+
+    def MAC(self):
+        return '00:00:00:00:00:01'
+
+class _Link:
+    def __init__(self, a, b, port_a, port_b):
+        self.intf1 = a.intfs[port_a] = _Intf(f"{a.name}-eth{port_a}", a)
+        self.intf2 = b.intfs[port_b] = _Intf(f"{b.name}-eth{port_b}", b)
+
+class _Net:
+    """h1 - s1 - s2"""
+    def __init__(self):
+        h1, s1, s2 = _Node('h1'), _Node('s1'), _Node('s2')
+        self.hosts = [h1]
+        self.switches = [s1, s2]
+        self.links = [_Link(h1, s1, 0, 1), _Link(s1, s2, 2, 1)]
+
+def _graph():
+    graph = TopologyGraph()
+    graph.load(_Net())
+    return graph
+
+def test_load_builds_graph():
+    graph = _graph()
+    assert graph.counts() == {'host_count': 1, 'switch_count': 2, 'link_count': 2}
+    assert graph.version == 1
+    assert {link['source'] for link in graph.snapshot()['links']} == {'h1', 's1'}
+
+def test_port_down_updates_link_once():
+    graph = _graph()
+    delta = graph.apply({'type': 'port_down', 'name': 's1-eth2'})
+    assert [link['status'] for link in delta['changes']['links']] == ['down']
+    assert graph.version == 2
+    # 重复事件不产生新版本
+    assert graph.apply({'type': 'port_down', 'name': 's1-eth2'}) is None
+    assert graph.version == 2
+
+def test_switch_remove_cascades_ports_and_links():
+    graph = _graph()
+    delta = graph.apply({'type': 'switch_remove', 'name': 's2'})
+    assert delta['changes']['removed_ports'] == ['s2-eth1']
+    assert delta['changes']['removed_links'] == ['s1-eth2|s2-eth1']
+    assert graph.counts()['link_count'] == 1
+
+def test_unknown_event_is_ignored():
+    graph = _graph()
+    assert graph.apply({'type': 'bogus'}) is None
+    assert graph.version == 1
+
+def test_deltas_since():
+    graph = TopologyGraph(max_deltas=2)
+    graph.load(_Net())
+    graph.apply({'type': 'switch_add', 'name': 's3'})
+    graph.apply({'type': 'switch_add', 'name': 's4'})
+    assert [delta['version'] for delta in graph.deltas_since(2)] == [3]
+    assert graph.deltas_since(3) == []
+    # 版本 1 之后的增量已不在缓冲区中
+    assert graph.deltas_since(0) is None
+
+def test_subscribers_receive_deltas():
+    graph = TopologyGraph()
+    received = []
+    graph.subscribe(received.append)
+    graph.apply({'type': 'switch_add', 'name': 's1'})
+    assert [delta['version'] for delta in received] == [1]
+
+def test_fake_source_feeds_graph():
+    async def run():
+        graph = TopologyGraph()
+        source = FakeEventSource()
+        for event in (
+            {'type': 'switch_add', 'name': 's1'},
+            {'type': 'switch_add', 'name': 's2'},
+            {'type': 'port_add', 'name': 's1-eth1', 'node': 's1', 'port_no': 1},
+            {'type': 'port_add', 'name': 's2-eth1', 'node': 's2', 'port_no': 1},
+            {'type': 'link_add', 'source_port': 's1-eth1', 'target_port': 's2-eth1'},
+            {'type': 'link_down', 'source_port': 's2-eth1', 'target_port': 's1-eth1'}
+        ):
+            source.push(event)
+        events = source.events()
+        for _ in range(6):
+            graph.apply(await events.__anext__())
+        return graph
+
+    graph = asyncio.run(run())
+    assert graph.counts() == {'host_count': 0, 'switch_count': 2, 'link_count': 1}
+    assert graph.links['s1-eth1|s2-eth1']['status'] == 'down'
+
+def test_ovsdb_parse_interface_update():
+    update = {
+        'headings': ['row', 'action', 'name', 'ofport', 'link_state'],
+        'data': [
+            ['u1', 'old', 's1-eth1', ['set', []], 'up'],
+            ['u1', 'new', 's1-eth1', 1, 'down'],
+            ['u2', 'insert', 's1-eth2', 2, 'up'],
+            ['u3', 'initial', 's1', 65534, 'up']
+        ]
+    }
+    assert OvsdbEventSource._parse('Interface', update) == [
+        {'type': 'port_down', 'name': 's1-eth1'},
+        {'type': 'port_add', 'name': 's1-eth2', 'node': 's1', 'port_no': 2},
+        {'type': 'port_up', 'name': 's1-eth2'}
+    ]
+
+def test_ovsdb_resync_reports_missed_removals():
+    source = OvsdbEventSource()
+    source.known['Bridge'] = {'s1', 's2'}
+    update = {'headings': ['row', 'action', 'name', 'datapath_id'], 'data': [['u1', 'initial', 's1', '1']]}
+    assert source._is_initial(update)
+    assert source._resync('Bridge', update) == [{'type': 'switch_remove', 'name': 's2'}]
+
+def test_ovsdb_links_from_veth_peers(tmp_path, monkeypatch):
+    for name, ifindex, iflink in (('s1-eth2', 10, 11), ('s2-eth1', 11, 10), ('s3-eth1', 12, 40), ('lo', 1, 1)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'ifindex').write_text(f"{ifindex}\n")
+        (tmp_path / name / 'iflink').write_text(f"{iflink}\n")
+    monkeypatch.setattr(OvsdbEventSource, 'SYSFS_NET', str(tmp_path))
+
+    source = OvsdbEventSource()
+    names = source.ifindex_names()
+    assert source.veth_peer('lo', names) is None
+    # 对端在其他命名空间（主机端口）
+    assert source.veth_peer('s3-eth1', names) is None
+    assert source._links_for(['s1-eth2']) == []  # 对端尚未出现
+    source.known['Interface'].update({'s1-eth2', 's2-eth1'})
+    # 同一次更新中两端都出现时只产生一条
+    assert source._links_for(['s1-eth2', 's2-eth1']) == [
+        {'type': 'link_add', 'source_port': 's1-eth2', 'target_port': 's2-eth1'}
+    ]
+
+def test_ovsdb_skips_ports_with_links(tmp_path, monkeypatch):
+    monkeypatch.setattr(OvsdbEventSource, 'SYSFS_NET', str(tmp_path))
+    source = OvsdbEventSource(graph=_graph())
+    monkeypatch.setattr(source, 'ifindex_names', lambda: pytest.fail("不应扫描 sysfs"))
+    assert source._links_for(['s1-eth2', 's2-eth1']) == []
+
+def test_link_waits_for_its_switch():
+    graph = TopologyGraph()
+    index = PathIndex(graph)
+    graph.apply({'type': 'switch_add', 'name': 's1'})
+    # Interface 表的更新先于 Bridge 表到达
+    for name, node in (('s1-eth1', 's1'), ('s2-eth1', 's2')):
+        graph.apply({'type': 'port_add', 'name': name, 'node': node, 'port_no': 1})
+    assert graph.apply({'type': 'link_add', 'source_port': 's1-eth1', 'target_port': 's2-eth1'}) is None
+    assert graph.links == {}
+
+    delta = graph.apply({'type': 'switch_add', 'name': 's2'})
+    assert [link['id'] for link in delta['changes']['links']] == ['s1-eth1|s2-eth1']
+    assert index.distance('s1', 's2') == 1
+
+def test_pending_link_dropped_with_its_port():
+    graph = TopologyGraph()
+    graph.apply({'type': 'switch_add', 'name': 's1'})
+    for name, node in (('s1-eth1', 's1'), ('s2-eth1', 's2')):
+        graph.apply({'type': 'port_add', 'name': name, 'node': node, 'port_no': 1})
+    graph.apply({'type': 'link_add', 'source_port': 's1-eth1', 'target_port': 's2-eth1'})
+    graph.apply({'type': 'port_remove', 'name': 's2-eth1'})
+    assert graph.apply({'type': 'switch_add', 'name': 's2'})['changes']['links'] == []
@@ -1,43 +1,43 @@
-// echarts基础配置
-export const baseChartOptions = {
-  title: {
-    textStyle: {
-      fontSize: 14,
-      fontWeight: 'normal'
-    }
-  },
-  tooltip: {
-    trigger: 'axis'
-  },
-  grid: {
-    left: '3%',
-    right: '4%',
-    bottom: '3%',
-    containLabel: true
-  }
-}
-
-// 流量图表配置
-export const trafficChartOptions = {
-  ...baseChartOptions,
-  xAxis: {
-    type: 'time',
-    splitLine: {
-      show: false
-    }
-  },
-  yAxis: {
-    type: 'value',
-    splitLine: {
-      lineStyle: {
-        type: 'dashed'
-      }
-    }
-  },
-  series: [
-    {
-      type: 'line',
-      smooth: true
-    }
-  ]
+// echarts基础配置
+export const baseChartOptions = {
+  title: {
+    textStyle: {
+      fontSize: 14,
+      fontWeight: 'normal'
+    }
+  },
+  tooltip: {
+    trigger: 'axis'
+  },
+  grid: {
+    left: '3%',
+    right: '4%',
+    bottom: '3%',
+    containLabel: true
+  }
+}
+
+// 流量图表配置
+export const trafficChartOptions = {
+  ...baseChartOptions,
+  xAxis: {
+    type: 'time',
+    splitLine: {
+      show: false
+    }
+  },
+  yAxis: {
+    type: 'value',
+    splitLine: {
+      lineStyle: {
+        type: 'dashed'
+      }
+    }
+  },
+  series: [
+    {
+      type: 'line',
+      smooth: true
+    }
+  ]
 } 
\ No newline at end of file